@@ -142,9 +142,10 @@ def start_diagnosis():
                     
                     # STEP 1: PM01 Raw
                     pm01_raw_results = None
+                    fused_pm05_raw_results = None
                     if start_from_step <= 1:
                         yield f"data: {json.dumps({'type': 'log', 'message': '  STEP 1: PM01 Raw処理中...', 'level': 'info'})}\n\n"
-                        pm01_raw_results = run_pm01_raw(
+                        pm01_raw_results, fused_pm05_raw_results = run_pm01_raw(
                             respondent=respondent,
                             questions=questions,
                             config=config,
@@ -187,7 +188,8 @@ def start_diagnosis():
                             pm01_raw_results=pm01_raw_results,
                             config=config,
                             llm_service=llm_service,
-                            sheets=sheets
+                            sheets=sheets,
+                            fused_results=fused_pm05_raw_results
                         )
                         if pm05_raw_results:
                             sheets.write_pm5raw_results(respondent, pm05_raw_results)
@@ -3,6 +3,7 @@ Category mapper - Maps question sheet categories to official categories.
 Shared by ScoringEngine and LLMService to ensure consistency.
 """
 
+import functools
 from typing import Optional
 
 
@@ -31,10 +32,13 @@ OFFICIAL_PROCESS_ITEMS = [
 ]
 
 
+@functools.lru_cache(maxsize=256)
 def map_to_official_category(category: str, category_type: str) -> Optional[str]:
     """
     Map question sheet category to official category.
     
+    Memoized: a questionnaire only has a handful of distinct categories, looked up for every respondent.
+    
     Args:
         category: Category from question sheet
         category_type: 'primary', 'sub', or 'process'
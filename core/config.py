@@ -56,6 +56,18 @@ class Config:
             except (ValueError, TypeError):
                 raise ValueError(f"Invalid number value for '{key}' in Config sheet: {raw}")
         
+        def get_optional_number(key: str, default: int) -> int:
+            raw = config_map.get(key)
+            if not raw:
+                return default
+            try:
+                return int(float(raw))
+            except (ValueError, TypeError):
+                raise ValueError(f"Invalid number value for '{key}' in Config sheet: {raw}")
+        
+        def get_flag(key: str) -> bool:
+            return str(config_map.get(key, '')).strip().lower() in ('true', '1', 'yes', 'on')
+        
         def get_string(key: str, required: bool = True) -> str:
             raw = config_map.get(key)
             if not raw and required:
@@ -76,6 +88,18 @@ class Config:
             'llmModel': get_string('llmModel'),
             'llmApiKey': get_string('llmApiKey'),
             'maxRetries': get_number('maxRetries'),
+            'llmMaxConcurrency': get_optional_number('llmMaxConcurrency', 6),  # Parallel per-question LLM calls
+            'llmRpm': get_optional_number('llmRpm', 0),  # LLM requests per minute limit (0 = unlimited)
+            'llmCacheTtl': get_optional_number('llmCacheTtl', 0),  # LLM response cache lifetime in seconds (0 = off, opt-in)
+            'llmCachePath': get_string('llmCachePath', required=False),  # LLM response cache file
+            'llmSharedAnswerCache': get_flag('llmSharedAnswerCache'),  # Share raw scoring responses across identical answers
+            'batchRawScoring': get_flag('batchRawScoring'),  # Score Q1-Q6 in one request per step (STEP 1/2)
+            'fuseRawSteps': get_flag('fuseRawSteps'),  # Score STEP 1 and STEP 2 in one request per question
+            'llmModelPM05Final': get_string('llmModelPM05Final', required=False),  # Cheaper model for STEP 4 (default: llmModel)
+            'llmStructuredOutputs': get_flag('llmStructuredOutputs'),  # Strict JSON Schema output per step
+            'llmGzipRequests': get_flag('llmGzipRequests'),  # gzip-compress LLM request bodies
+            'llmStream': get_flag('llmStream'),  # Stream responses and stop once the JSON object is complete
+            'useBatchApi': get_flag('useBatchApi'),  # Run STEP 1/2 through the OpenAI Batch API (offline runs)
             'promptPM1Raw': get_string('promptPM1Raw', required=False),  # STEP 1: PM01 Raw Scoring
             'promptPM1Final': get_string('promptPM1Final', required=False),  # STEP 3: PM01 Final (analysis)
             'promptPM5Raw': get_string('promptPM5Raw', required=False),  # STEP 2: PM05 Raw Scoring (reverse logic)
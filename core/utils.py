@@ -2,8 +2,14 @@
 Utility functions.
 """
 
+import json
 from datetime import datetime
-from typing import List, TypeVar
+from typing import Any, List, TypeVar
+
+try:
+    import orjson  # Optional C JSON parser (faster loads); falls back to the stdlib json module
+except ImportError:
+    orjson = None
 
 T = TypeVar('T')
 
@@ -50,13 +56,36 @@ def parse_number(value: any, fallback: float = 0.0) -> float:
 
 def safe_json_parse(json_str: str) -> dict | None:
     """Safely parses JSON content and returns None when parsing fails."""
-    import json
     try:
+        if orjson is not None:
+            return orjson.loads(json_str)
         return json.loads(json_str)
     except (json.JSONDecodeError, TypeError):
+        # orjson.JSONDecodeError is a subclass of json.JSONDecodeError
         return None
 
 
+def json_loads(data: str | bytes) -> Any:
+    """Parses JSON text or bytes (orjson when installed, stdlib json otherwise)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj: Any) -> str:
+    """Serializes an object to compact JSON text with non-ASCII kept as-is (orjson when installed)."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+
+def json_dumps_bytes(obj: Any) -> bytes:
+    """Serializes an object to UTF-8 JSON bytes (orjson when installed, stdlib json otherwise)."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+
 def sanitize_answer(answer: str) -> str:
     """Sanitizes a free-form answer to the maximum length used in downstream prompts."""
     return answer.strip()[:400]
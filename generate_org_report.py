@@ -2,7 +2,11 @@
 """
 Standalone script to generate organization reports from existing PM1Final data.
 Usage: python generate_org_report.py [company_name] [department_name]
+       python generate_org_report.py --all
 If no company_name is provided, lists all available companies.
+--all generates a report for every company (concurrently, up to llmMaxConcurrency at a time).
+PM1Final is read once for the whole --all run, so rows written by another process while it runs
+(e.g. a concurrent diagnosis run) are not included.
 """
 
 import sys
@@ -17,26 +21,34 @@ from services.llm import LLMService
 from core.config import Config
 
 
-def list_companies():
-    """List all companies with completed diagnoses."""
-    sheets = SheetsService(config=None)
-    config = Config.get_config(sheets_service=sheets)
-    sheets.config = config
-    
+def get_company_names(sheets: SheetsService) -> set | None:
+    """Company names found in the PM1Final sheet (None when the sheet is missing or empty)."""
     pm1final_sheet = sheets._get_sheet('PM1Final')
     if not pm1final_sheet:
         print("Error: PM1Final sheet not found")
-        return
+        return None
     
     values = pm1final_sheet.get_all_values()
     if len(values) <= 1:
         print("No data found in PM1Final sheet")
-        return
+        return None
     
     companies = set()
     for row in values[1:]:
         if len(row) > 1 and row[1]:  # Company_Name column
             companies.add(row[1].strip())
+    return companies
+
+
+def list_companies():
+    """List all companies with completed diagnoses."""
+    sheets = SheetsService(config=None)
+    config = Config.get_config(sheets_service=sheets)
+    sheets.config = config
+    
+    companies = get_company_names(sheets)
+    if companies is None:
+        return
     
     if companies:
         print("\nAvailable companies:")
@@ -75,9 +87,37 @@ def generate_org_report(company_name: str, department: str = None):
         traceback.print_exc()
 
 
+def generate_all_org_reports():
+    """Generate organization reports for every company in PM1Final."""
+    sheets = SheetsService(config=None)
+    config = Config.get_config(sheets_service=sheets)
+    sheets.config = config
+    
+    companies = get_company_names(sheets)
+    if not companies:
+        return
+    
+    report_service = ReportService(output_dir="report", sheets_service=sheets)
+    llm_service = LLMService(config)
+    
+    targets = [(company, None) for company in sorted(companies)]
+    print(f"Generating organization reports for {len(targets)} companies...")
+    results = report_service.generate_organization_reports(targets, sheets, llm_service, config)
+    
+    for (company, _), (report_output, error) in zip(targets, results):
+        if error:
+            print(f"\n✗ {company}: {error}")
+        else:
+            print(f"\n✓ {company}: {report_output['filepath']}")
+            print(f"  ✓ Report URL: {report_output['url']}")
+
+
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
+    if len(sys.argv) >= 2 and sys.argv[1] == '--all':
+        generate_all_org_reports()
+    elif len(sys.argv) < 2:
         print("Usage: python generate_org_report.py [company_name] [department_name]")
+        print("       python generate_org_report.py --all")
         print("\nTo list available companies, run without arguments:")
         list_companies()
     else:
@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 """
 Standalone script to generate individual reports from existing PM1Final and PM5Final data.
-Usage: python generate_report.py [respondent_id]
+Usage: python generate_report.py [--skip-llm] [respondent_id]
 If no respondent_id is provided, generates reports for all completed respondents.
+--skip-llm generates score-only previews without the LLM thinking pattern analysis.
 """
 
 import sys
@@ -18,7 +19,7 @@ from services.llm import LLMService
 from core.config import Config
 
 
-def generate_report_for_respondent(respondent_id: str = None):
+def generate_report_for_respondent(respondent_id: str = None, skip_llm: bool = False):
     """Generate report for a specific respondent or all completed respondents."""
     # Initialize services
     sheets = SheetsService(config=None)
@@ -38,22 +39,24 @@ def generate_report_for_respondent(respondent_id: str = None):
             print(f"Error: Respondent ID '{respondent_id}' not found")
             return
         
-        generate_single_report(sheets, report_service, respondent, llm_service, config)
+        generate_single_report(sheets, report_service, respondent, llm_service, config, skip_llm)
     else:
         # Generate reports for all completed respondents
         print(f"Generating reports for all completed respondents...")
         completed_count = 0
         
-        for respondent in respondents:
-            status = respondent.get('status', '').strip().lower()
-            if 'pm5final完了' in status or 'pm5final完成' in status:
-                if generate_single_report(sheets, report_service, respondent, llm_service, config):
-                    completed_count += 1
+        # Report URL mappings of the whole run are appended to the sheet together
+        with report_service.batch():
+            for respondent in respondents:
+                status = respondent.get('status', '').strip().lower()
+                if 'pm5final完了' in status or 'pm5final完成' in status:
+                    if generate_single_report(sheets, report_service, respondent, llm_service, config, skip_llm):
+                        completed_count += 1
         
         print(f"\n✓ Generated {completed_count} reports")
 
 
-def generate_single_report(sheets: SheetsService, report_service: ReportService, respondent: dict, llm_service: LLMService, config: dict) -> bool:
+def generate_single_report(sheets: SheetsService, report_service: ReportService, respondent: dict, llm_service: LLMService, config: dict, skip_llm: bool = False) -> bool:
     """Generate report for a single respondent."""
     try:
         respondent_id = respondent['id']
@@ -111,7 +114,8 @@ def generate_single_report(sheets: SheetsService, report_service: ReportService,
             pm01_final=pm01_final,
             pm05_final=pm05_final,
             llm_service=llm_service,
-            config=config
+            config=config,
+            skip_llm=skip_llm
         )
         
         print(f"  ✓ Report generated: {report_result['filepath']}")
@@ -126,6 +130,9 @@ def generate_single_report(sheets: SheetsService, report_service: ReportService,
 
 
 if __name__ == "__main__":
-    respondent_id = sys.argv[1] if len(sys.argv) > 1 else None
-    generate_report_for_respondent(respondent_id)
+    args = sys.argv[1:]
+    skip_llm = '--skip-llm' in args
+    args = [arg for arg in args if arg != '--skip-llm']
+    respondent_id = args[0] if args else None
+    generate_report_for_respondent(respondent_id, skip_llm)
 
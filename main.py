@@ -7,8 +7,9 @@ Processes respondents one by one with Q1-Q6 answers.
 import sys
 import traceback
 import json
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -113,6 +114,21 @@ def main():
         print(f"Starting diagnosis with run ID: {run_id}")
         print(f"Processing {len(unprocessed)} respondents one by one...")
         
+        # Offline mode: run STEP 1/2 for all new respondents through the Batch API first.
+        # Respondents that succeed resume at STEP 3 below; the rest are retried one by one.
+        if config.get('useBatchApi'):
+            process_respondents_batch(
+                respondents=unprocessed,
+                questions=questions,
+                llm_service=llm_service,
+                sheets=sheets
+            )
+        
+        # Runs STEP 4 while the STEP 3 results are written to the sheet
+        step4_executor = ThreadPoolExecutor(max_workers=1)
+        # One report service for the whole run rather than one per respondent
+        report_service = ReportService(output_dir="report", sheets_service=sheets)
+        
         # Process each respondent
         for idx, respondent in enumerate(unprocessed, 1):
             try:
@@ -136,9 +152,10 @@ def main():
                 
                 # STEP 1: PM01 Raw Scoring (Individual Q-A scoring)
                 pm01_raw_results = None
+                fused_pm05_raw_results = None
                 if start_from_step <= 1:
                     print("  STEP 1: PM01 Raw Scoring...")
-                    pm01_raw_results = run_pm01_raw(
+                    pm01_raw_results, fused_pm05_raw_results = run_pm01_raw(
                         respondent=respondent,
                         questions=questions,
                         config=config,
@@ -202,7 +219,8 @@ def main():
                         pm01_raw_results=pm01_raw_results,
                         config=config,
                         llm_service=llm_service,
-                        sheets=sheets
+                        sheets=sheets,
+                        fused_results=fused_pm05_raw_results
                     )
                     
                     if not pm05_raw_results:
@@ -247,6 +265,7 @@ def main():
                 
                 # STEP 3: PM01 Final (Aggregate PM05 Raw scores + LLM analysis)
                 pm01_final = None
+                pm05_final_future = None
                 if start_from_step <= 3:
                     print("  STEP 3: PM01 Final (Aggregation + Analysis)...")
                     
@@ -312,13 +331,34 @@ def main():
                         print(f"✗ STEP 3 combination failed for {respondent['id']}")
                         continue
                     
-                    # Write PM01 Final results to sheet
-                    sheets.write_pm1final_results(respondent, pm01_final)
-                    print(f"  ✓ PM01 Final results written to PM1Final sheet")
+                    # STEP 4 only needs pm01_final: start its LLM call before the sheet writes below
+                    # (the worker never touches the sheet; failures are logged here on the main thread)
+                    print("  STEP 4: PM05 Final (Consistency Check)...")
+                    pm05_final_future = step4_executor.submit(
+                        run_pm05_final_attempts,
+                        respondent=respondent,
+                        pm01_final=pm01_final,
+                        config=config,
+                        llm_service=llm_service,
+                        scoring_engine=scoring_engine
+                    )
                     
-                    # Update status after STEP 3
-                    sheets.update_respondent_status(respondent['rowIndex'], 'PM1Final完了')
-                    print(f"  ✓ Status updated to PM1Final完了")
+                    step3_written = False
+                    try:
+                        # Write PM01 Final results to sheet
+                        sheets.write_pm1final_results(respondent, pm01_final)
+                        print(f"  ✓ PM01 Final results written to PM1Final sheet")
+                        
+                        # Update status after STEP 3
+                        sheets.update_respondent_status(respondent['rowIndex'], 'PM1Final完了')
+                        print(f"  ✓ Status updated to PM1Final完了")
+                        step3_written = True
+                    finally:
+                        if not step3_written:
+                            # STEP 3 was not saved: drop STEP 4 (or wait out a call already in flight)
+                            # so it does not run on into the next respondent
+                            if not pm05_final_future.cancel():
+                                wait([pm05_final_future])
                 else:
                     print("  STEP 3: Skipped (already completed)")
                     # Try to read from PM1Final sheet
@@ -354,15 +394,20 @@ def main():
                         continue
                 
                 # STEP 4: PM05 Final (Consistency check)
-                print("  STEP 4: PM05 Final (Consistency Check)...")
-                pm05_final = run_pm05_final(
-                    respondent=respondent,
-                    pm01_final=pm01_final,
-                    config=config,
-                    llm_service=llm_service,
-                    scoring_engine=scoring_engine,
-                    sheets=sheets
-                )
+                if pm05_final_future:
+                    pm05_final, pm05_final_error = pm05_final_future.result()
+                    if pm05_final_error:
+                        log_pm05_final_failure(sheets, respondent, config, pm05_final_error)
+                else:
+                    print("  STEP 4: PM05 Final (Consistency Check)...")
+                    pm05_final = run_pm05_final(
+                        respondent=respondent,
+                        pm01_final=pm01_final,
+                        config=config,
+                        llm_service=llm_service,
+                        scoring_engine=scoring_engine,
+                        sheets=sheets
+                    )
                 
                 if pm05_final:
                     # Write PM05 Final results to sheet
@@ -375,7 +420,6 @@ def main():
                     
                     # Generate individual report
                     try:
-                        report_service = ReportService(output_dir="report", sheets_service=sheets)
                         report_result = report_service.generate_individual_report(
                             respondent=respondent,
                             pm01_final=pm01_final,
@@ -410,6 +454,8 @@ def main():
                     'details': {'error': str(e)}
                 })
         
+        step4_executor.shutdown()
+        
         # Finalize run
         duration_ms = int((datetime.now() - started_at).total_seconds() * 1000)
         sheets.write_run_log({
@@ -426,6 +472,9 @@ def main():
         print(f"Processed: {total_processed}")
         print(f"Errors: {total_errors}")
         print(f"Duration: {duration_ms}ms ({duration_ms//60000}分{(duration_ms%60000)//1000}秒)")
+        if llm_service.response_cache:
+            cache_stats = llm_service.response_cache.stats()
+            print(f"LLM cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
         print(f"{'='*60}")
         
     except Exception as e:
@@ -434,22 +483,149 @@ def main():
         sys.exit(1)
 
 
+def process_respondents_batch(
+    respondents: List[Dict[str, Any]],
+    questions: list,
+    llm_service: LLMService,
+    sheets: SheetsService
+) -> None:
+    """
+    STEP 1 + STEP 2 for all respondents that have not started yet, via the OpenAI Batch API.
+    
+    Successful respondents get their results written and status set to PM5Raw完了 (also in memory),
+    so the per-respondent loop resumes them at STEP 3.
+    """
+    new_respondents = [r for r in respondents if not r.get('status', '').strip()]
+    if not new_respondents:
+        return
+    
+    try:
+        print(f"STEP 1 (Batch API): {len(new_respondents)} respondents...")
+        pm01_raw_by_id = llm_service.run_pm01_raw_scoring_batch_api(new_respondents, questions)
+        for respondent in new_respondents:
+            pm01_raw_results = pm01_raw_by_id.get(respondent['id'])
+            if pm01_raw_results:
+                sheets.write_pm1raw_results(respondent, pm01_raw_results)
+                sheets.update_respondent_status(respondent['rowIndex'], 'PM1Raw完了')
+                respondent['status'] = 'PM1Raw完了'
+        print(f"  ✓ STEP 1 (Batch API) completed for {len(pm01_raw_by_id)} respondents")
+        
+        print(f"STEP 2 (Batch API): {len(pm01_raw_by_id)} respondents...")
+        pm05_raw_by_id = llm_service.run_pm05_raw_scoring_batch_api(new_respondents, questions, pm01_raw_by_id)
+        for respondent in new_respondents:
+            pm05_raw_results = pm05_raw_by_id.get(respondent['id'])
+            if pm05_raw_results:
+                sheets.write_pm5raw_results(respondent, pm05_raw_results)
+                sheets.update_respondent_status(respondent['rowIndex'], 'PM5Raw完了')
+                respondent['status'] = 'PM5Raw完了'
+        print(f"  ✓ STEP 2 (Batch API) completed for {len(pm05_raw_by_id)} respondents")
+    except Exception as e:
+        # Fall back to the regular per-respondent flow for anything not finished
+        print(f"Batch API processing failed: {e}")
+        traceback.print_exc()
+
+
+def _run_question_with_retries(
+    question_id: str,
+    max_retries: int,
+    label: str,
+    call
+) -> Tuple[Dict[str, Any] | None, Exception | None]:
+    """
+    Runs one per-question LLM call with retries.
+    
+    Returns (result, error of the last attempt when it raised) - earlier failed attempts are not reported,
+    so only a failure of the final attempt gets logged, as before.
+    """
+    attempt = 0
+    last_error = None
+    
+    while attempt < max_retries:
+        attempt += 1
+        print(f"      {question_id} Attempt {attempt}/{max_retries}...")
+        last_error = None
+        
+        try:
+            llm_response = call(attempt)
+            
+            if llm_response:
+                print(f"      ✓ {question_id} {label} completed")
+                return llm_response, None
+                
+        except Exception as e:
+            print(f"      Error in {question_id} attempt {attempt}: {e}")
+            last_error = e
+    
+    return None, last_error
+
+
+def _run_questions_parallel(
+    jobs: List[Tuple[str, Any]],
+    config: Dict[str, Any],
+    label: str
+) -> Dict[str, Tuple[Dict[str, Any] | None, Exception | None]]:
+    """Runs per-question jobs concurrently (network-bound LLM calls) and returns results by question ID."""
+    max_retries = config.get('maxRetries')
+    max_workers = max(1, min(config.get('llmMaxConcurrency') or 1, len(jobs)))
+    
+    if max_workers == 1:
+        return {
+            question_id: _run_question_with_retries(question_id, max_retries, label, call)
+            for question_id, call in jobs
+        }
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            question_id: executor.submit(_run_question_with_retries, question_id, max_retries, label, call)
+            for question_id, call in jobs
+        }
+        return {question_id: future.result() for question_id, future in futures.items()}
+
+
 def run_pm01_raw(
     respondent: Dict[str, Any],
     questions: list,
     config: Dict[str, Any],
     llm_service: LLMService,
     sheets: SheetsService
-) -> Dict[str, Dict[str, Any]] | None:
+) -> Tuple[Dict[str, Dict[str, Any]] | None, Dict[str, Dict[str, Any]] | None]:
     """
     STEP 1: PM01 Raw Scoring - Individual Q-A scoring.
     
-    Returns dict mapping Q1-Q6 to their raw scoring results.
+    Q1-Q6 are independent, so they are scored concurrently (up to llmMaxConcurrency).
+    With fuseRawSteps, each request also returns the STEP 2 result, to be passed on to run_pm05_raw.
+    Returns (dict mapping Q1-Q6 to their raw scoring results, dict mapping Q1-Q6 to their STEP 2 results
+    with fuseRawSteps, else None); (None, None) if failed.
     """
     max_retries = config.get('maxRetries')
-    all_question_results = {}
     
-    # Process each question individually
+    if config.get('batchRawScoring'):
+        # Q1-Q6 in a single request
+        results, error = _run_question_with_retries(
+            'Q1-Q6',
+            max_retries,
+            'batch raw scoring',
+            lambda attempt: llm_service.run_pm01_raw_scoring_batch(respondent, questions, attempt)
+        )
+        if not results:
+            if error:
+                sheets.log_error({
+                    'respondentId': respondent['id'],
+                    'category': 'PM01_RAW_FAILED',
+                    'message': f'Batch raw scoring failed after {max_retries} attempts',
+                    'attempt': max_retries,
+                    'timestamp': datetime.now(),
+                    'details': {'error': str(error), 'question': 'Q1-Q6'}
+                })
+            print(f"    ✗ Batch raw scoring failed")
+            return None, None
+        
+        print(f"  ✓ STEP 1 completed (all Q-A raw scoring)")
+        return results, None
+    
+    fuse = config.get('fuseRawSteps')
+    jobs = []
+    
     for i, question in enumerate(questions):
         if question['number'] < 1 or question['number'] > 6:
             continue
@@ -457,47 +633,53 @@ def run_pm01_raw(
         question_id = f"Q{question['number']}"
         print(f"    Processing {question_id}...")
         
-        attempt = 0
-        question_result = None
-        
-        while attempt < max_retries:
-            attempt += 1
-            print(f"      {question_id} Attempt {attempt}/{max_retries}...")
-            
-            try:
-                # Get LLM evaluation for this single question
-                llm_response = llm_service.run_pm01_raw_scoring(
+        def call(attempt, question=question, i=i):
+            if fuse:
+                # STEP 1 + STEP 2 in one request ({'pm01_raw_result': ..., 'pm05_raw_result': ...})
+                return llm_service.run_raw_scoring_fused(
                     respondent=respondent,
                     question=question,
                     question_index=i,
                     attempt=attempt
                 )
-                
-                if llm_response:
-                    question_result = llm_response
-                    print(f"      ✓ {question_id} raw scoring completed")
-                    break
-                    
-            except Exception as e:
-                print(f"      Error in {question_id} attempt {attempt}: {e}")
-                if attempt >= max_retries:
-                    sheets.log_error({
-                        'respondentId': respondent['id'],
-                        'category': 'PM01_RAW_FAILED',
-                        'message': f'{question_id} raw scoring failed after {max_retries} attempts',
-                        'attempt': max_retries,
-                        'timestamp': datetime.now(),
-                        'details': {'error': str(e), 'question': question_id}
-                    })
+            
+            # Get LLM evaluation for this single question
+            return llm_service.run_pm01_raw_scoring(
+                respondent=respondent,
+                question=question,
+                question_index=i,
+                attempt=attempt
+            )
         
+        jobs.append((question_id, call))
+    
+    results = _run_questions_parallel(jobs, config, 'raw scoring')
+    
+    # Sheet writes stay on the main thread and in question order
+    all_question_results = {}
+    fused_pm05_results = {} if fuse else None
+    for question_id, (question_result, error) in results.items():
         if not question_result:
+            if error:
+                sheets.log_error({
+                    'respondentId': respondent['id'],
+                    'category': 'PM01_RAW_FAILED',
+                    'message': f'{question_id} raw scoring failed after {max_retries} attempts',
+                    'attempt': max_retries,
+                    'timestamp': datetime.now(),
+                    'details': {'error': str(error), 'question': question_id}
+                })
             print(f"    ✗ {question_id} raw scoring failed")
-            return None
+            return None, None
         
-        all_question_results[question_id] = question_result
+        if fuse:
+            all_question_results[question_id] = question_result['pm01_raw_result']
+            fused_pm05_results[question_id] = question_result['pm05_raw_result']
+        else:
+            all_question_results[question_id] = question_result
     
     print(f"  ✓ STEP 1 completed (all Q-A raw scoring)")
-    return all_question_results
+    return all_question_results, fused_pm05_results
 
 
 def run_pm05_raw(
@@ -506,17 +688,57 @@ def run_pm05_raw(
     pm01_raw_results: Dict[str, Dict[str, Any]],
     config: Dict[str, Any],
     llm_service: LLMService,
-    sheets: SheetsService
+    sheets: SheetsService,
+    fused_results: Dict[str, Dict[str, Any]] | None = None
 ) -> Dict[str, Dict[str, Any]] | None:
     """
     STEP 2: PM05 Raw Scoring - Reverse logic scoring using PM01 raw as reference.
     
+    Q1-Q6 are independent, so they are scored concurrently (up to llmMaxConcurrency).
+    fused_results are the STEP 2 results already returned by run_pm01_raw with fuseRawSteps, if any.
     Returns dict mapping Q1-Q6 to their reverse-scored results.
     """
     max_retries = config.get('maxRetries')
-    all_question_results = {}
     
-    # Process each question individually
+    # fuseRawSteps: STEP 1 already returned the reverse scoring (not when STEP 1 results came from the sheet)
+    if fused_results:
+        print(f"  ✓ STEP 2 completed (reverse scoring returned with STEP 1)")
+        return fused_results
+    
+    if config.get('batchRawScoring'):
+        missing = [
+            f"Q{question['number']}" for question in questions
+            if 1 <= question['number'] <= 6 and not pm01_raw_results.get(f"Q{question['number']}")
+        ]
+        if missing:
+            print(f"    ✗ {', '.join(missing)} PM01 raw result not found")
+            return None
+        
+        # Q1-Q6 in a single request
+        results, error = _run_question_with_retries(
+            'Q1-Q6',
+            max_retries,
+            'batch reverse scoring',
+            lambda attempt: llm_service.run_pm05_raw_scoring_batch(respondent, questions, pm01_raw_results, attempt)
+        )
+        if not results:
+            if error:
+                sheets.log_error({
+                    'respondentId': respondent['id'],
+                    'category': 'PM05_RAW_FAILED',
+                    'message': f'Batch reverse scoring failed after {max_retries} attempts',
+                    'attempt': max_retries,
+                    'timestamp': datetime.now(),
+                    'details': {'error': str(error), 'question': 'Q1-Q6'}
+                })
+            print(f"    ✗ Batch reverse scoring failed")
+            return None
+        
+        print(f"  ✓ STEP 2 completed (all Q-A reverse scoring)")
+        return results
+    
+    jobs = []
+    
     for i, question in enumerate(questions):
         if question['number'] < 1 or question['number'] > 6:
             continue
@@ -530,41 +752,33 @@ def run_pm05_raw(
         
         print(f"    Processing {question_id} reverse scoring...")
         
-        attempt = 0
-        question_result = None
-        
-        while attempt < max_retries:
-            attempt += 1
-            print(f"      {question_id} Attempt {attempt}/{max_retries}...")
-            
-            try:
-                # Get reverse logic evaluation for this single question
-                llm_response = llm_service.run_pm05_raw_scoring(
-                    respondent=respondent,
-                    question=question,
-                    question_index=i,
-                    pm01_raw_result=pm01_raw,
-                    attempt=attempt
-                )
-                
-                if llm_response:
-                    question_result = llm_response
-                    print(f"      ✓ {question_id} reverse scoring completed")
-                    break
-                    
-            except Exception as e:
-                print(f"      Error in {question_id} attempt {attempt}: {e}")
-                if attempt >= max_retries:
-                    sheets.log_error({
-                        'respondentId': respondent['id'],
-                        'category': 'PM05_RAW_FAILED',
-                        'message': f'{question_id} reverse scoring failed after {max_retries} attempts',
-                        'attempt': max_retries,
-                        'timestamp': datetime.now(),
-                        'details': {'error': str(e), 'question': question_id}
-                    })
+        def call(attempt, question=question, i=i, pm01_raw=pm01_raw):
+            # Get reverse logic evaluation for this single question
+            return llm_service.run_pm05_raw_scoring(
+                respondent=respondent,
+                question=question,
+                question_index=i,
+                pm01_raw_result=pm01_raw,
+                attempt=attempt
+            )
         
+        jobs.append((question_id, call))
+    
+    results = _run_questions_parallel(jobs, config, 'reverse scoring')
+    
+    # Sheet writes stay on the main thread and in question order
+    all_question_results = {}
+    for question_id, (question_result, error) in results.items():
         if not question_result:
+            if error:
+                sheets.log_error({
+                    'respondentId': respondent['id'],
+                    'category': 'PM05_RAW_FAILED',
+                    'message': f'{question_id} reverse scoring failed after {max_retries} attempts',
+                    'attempt': max_retries,
+                    'timestamp': datetime.now(),
+                    'details': {'error': str(error), 'question': question_id}
+                })
             print(f"    ✗ {question_id} reverse scoring failed")
             return None
         
@@ -587,6 +801,42 @@ def run_pm05_final(
     
     Returns PM05 final result dict or None if failed.
     """
+    pm05_final, error = run_pm05_final_attempts(respondent, pm01_final, config, llm_service, scoring_engine)
+    if error:
+        log_pm05_final_failure(sheets, respondent, config, error)
+    return pm05_final
+
+
+def log_pm05_final_failure(
+    sheets: SheetsService,
+    respondent: Dict[str, Any],
+    config: Dict[str, Any],
+    error: Exception
+) -> None:
+    """Logs a STEP 4 failure whose last attempt raised."""
+    max_retries = config.get('maxRetries')
+    sheets.log_error({
+        'respondentId': respondent['id'],
+        'category': 'PM05_FINAL_FAILED',
+        'message': f'PM05 Final failed after {max_retries} attempts',
+        'attempt': max_retries,
+        'timestamp': datetime.now(),
+        'details': {'error': str(error)}
+    })
+
+
+def run_pm05_final_attempts(
+    respondent: Dict[str, Any],
+    pm01_final: Dict[str, Any],
+    config: Dict[str, Any],
+    llm_service: LLMService,
+    scoring_engine: 'ScoringEngine'
+) -> Tuple[Dict[str, Any] | None, Exception | None]:
+    """
+    STEP 4 attempts without any sheet access, so it can run on a worker thread.
+    
+    Returns (PM05 final result or None, error of the last attempt when it raised).
+    """
     max_retries = config.get('maxRetries')
     attempt = 0
     
@@ -613,22 +863,14 @@ def run_pm05_final(
             
             if pm05_final_result:
                 print(f"  ✓ STEP 4 completed (consistency check)")
-                return pm05_final_result
+                return pm05_final_result, None
                 
         except Exception as e:
             print(f"    Error in PM05 Final attempt {attempt}: {e}")
             if attempt >= max_retries:
-                sheets.log_error({
-                    'respondentId': respondent['id'],
-                    'category': 'PM05_FINAL_FAILED',
-                    'message': f'PM05 Final failed after {max_retries} attempts',
-                    'attempt': max_retries,
-                    'timestamp': datetime.now(),
-                    'details': {'error': str(e)}
-                })
-                return None
+                return None, e
     
-    return None
+    return None, None
 
 if __name__ == '__main__':
     main()
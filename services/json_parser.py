@@ -4,68 +4,82 @@ JSON parser service - parses PM01 and PM05 LLM responses with error recovery.
 
 import json
 import re
-from typing import Dict, Any, Optional
-from core.utils import safe_json_parse, parse_number
+from typing import Dict, List, Any, Optional, Tuple
+from core.utils import safe_json_parse, parse_number, json_loads
+
+_NAN = float('nan')
+
+# Score fields validated on every raw response (1.0-5.0, 1 decimal place)
+PM01_RAW_SCORE_KEYS = (
+    'primary_score', 'sub_score', 'process_score',
+    'aes_clarity', 'aes_logic', 'aes_relevance'
+)
+PM05_RAW_SCORE_KEYS = ('primary_score', 'sub_score', 'process_score')
+
+# Trailing commas before a closing brace/bracket (common LLM JSON mistake)
+_TRAILING_COMMA_RE = re.compile(r',(\s*[}\]])')
+
+
+def _round1(x: float) -> float:
+    """Rounds a validated non-negative score to 1 decimal place (half-up)."""
+    return int(x * 10.0 + 0.5) / 10.0
+
+
+def _round2(x: float) -> float:
+    """Rounds a validated non-negative score to 2 decimal places (half-up)."""
+    return int(x * 100.0 + 0.5) / 100.0
+
+
+# Accepted values for the PM01/PM05 Final responses (built once at import)
+_AI_USE_LEVELS = frozenset(['基礎', '標準', '高度'])
+_STATUSES = frozenset(['妥当', '注意', '再評価'])
+# Map English status values to Japanese
+_STATUS_MAP = {
+    'valid': '妥当',
+    'caution': '注意',
+    're-evaluate': '再評価',
+    'reevaluate': '再評価'
+}
+
+# Question IDs Q1-Q6, built once instead of per response
+_Q_IDS = tuple(f'Q{i}' for i in range(1, 7))
 
 
 class JsonParser:
     """Service for parsing JSON responses from LLM."""
     
+    # Stateless: no per-instance __dict__ is needed
+    __slots__ = ()
+    
     def parse_pm01_raw_response(self, raw: str, question_number: int) -> Optional[Dict[str, Any]]:
         """Parse PM01 Raw Scoring response for a single question."""
-        parsed = self._parse_with_repair(raw)
-        if not parsed or not isinstance(parsed, dict):
-            return None
-        
-        # Validate scores are numbers (1 decimal place)
-        for score_key in ['primary_score', 'sub_score', 'process_score']:
-            score = parse_number(parsed.get(score_key), float('nan'))
-            if score == float('nan') or score < 1.0 or score > 5.0:
-                print(f"Warning: Invalid {score_key} for Q{question_number}: {parsed.get(score_key)}")
-                return None
-            parsed[score_key] = round(score, 1)
-        
-        # Validate AES components (clarity, logic, relevance) - 1 decimal place
-        for aes_key in ['aes_clarity', 'aes_logic', 'aes_relevance']:
-            score = parse_number(parsed.get(aes_key), float('nan'))
-            if score == float('nan') or score < 1.0 or score > 5.0:
-                print(f"Warning: Invalid {aes_key} for Q{question_number}: {parsed.get(aes_key)}")
-                return None
-            parsed[aes_key] = round(score, 1)
-        
-        # Validate evidence and judgment_reason (required)
-        if not parsed.get('evidence') or not parsed.get('judgment_reason'):
-            print(f"Warning: Missing evidence or judgment_reason for Q{question_number}")
-            return None
-        
-        # Add question number for reference
-        parsed['question_number'] = question_number
-        
-        return parsed
+        return self._validate_pm01_raw(self._parse_with_repair(raw), question_number)
     
     def parse_pm05_raw_response(self, raw: str, question_number: int) -> Optional[Dict[str, Any]]:
         """Parse PM05 Raw Scoring response for a single question."""
+        return self._validate_pm05_raw(self._parse_with_repair(raw), question_number)
+    
+    def parse_pm01_raw_batch_response(self, raw: str, question_numbers: List[int]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Parse a single PM01 Raw Scoring response covering several questions (keyed by per_question.Qn)."""
+        return self._parse_raw_batch_response(raw, question_numbers, self._validate_pm01_raw)
+    
+    def parse_pm05_raw_batch_response(self, raw: str, question_numbers: List[int]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Parse a single PM05 Raw Scoring response covering several questions (keyed by per_question.Qn)."""
+        return self._parse_raw_batch_response(raw, question_numbers, self._validate_pm05_raw)
+    
+    def parse_raw_fused_response(self, raw: str, question_number: int) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Parse a combined PM01 + PM05 Raw Scoring response for a single question (keyed by pm01/pm05)."""
         parsed = self._parse_with_repair(raw)
         if not parsed or not isinstance(parsed, dict):
             return None
         
-        # Validate scores are numbers (1 decimal place)
-        for score_key in ['primary_score', 'sub_score', 'process_score']:
-            score = parse_number(parsed.get(score_key), float('nan'))
-            if score == float('nan') or score < 1.0 or score > 5.0:
-                print(f"Warning: Invalid {score_key} for Q{question_number}: {parsed.get(score_key)}")
-                return None
-            parsed[score_key] = round(score, 1)
-        
-        # Validate difference_note (required)
-        if not parsed.get('difference_note'):
-            print(f"Warning: Missing difference_note for Q{question_number}")
+        pm01_raw_result = self._validate_pm01_raw(parsed.get('pm01'), question_number)
+        pm05_raw_result = self._validate_pm05_raw(parsed.get('pm05'), question_number)
+        if not pm01_raw_result or not pm05_raw_result:
+            print(f"Warning: Missing or invalid pm01/pm05 in fused raw response for Q{question_number}")
             return None
         
-        # Add question number for reference
-        parsed['question_number'] = question_number
-        
-        return parsed
+        return {'pm01_raw_result': pm01_raw_result, 'pm05_raw_result': pm05_raw_result}
     
     def parse_pm01_final_response(self, raw: str) -> Optional[Dict[str, Any]]:
         """Parse PM01 Final analysis response."""
@@ -80,7 +94,7 @@ class JsonParser:
         
         # Validate ai_use_level
         ai_use_level = parsed.get('ai_use_level', '')
-        if ai_use_level not in ['基礎', '標準', '高度']:
+        if ai_use_level not in _AI_USE_LEVELS:
             print(f"Warning: Invalid ai_use_level: {ai_use_level}")
             parsed['ai_use_level'] = '標準'  # Default
         
@@ -97,25 +111,19 @@ class JsonParser:
             return None
         
         # Validate consistency_score (0.0-1.0 range based on formula: 1 - (score_std / 2.5))
-        consistency_score = parse_number(parsed.get('consistency_score'), float('nan'))
-        if consistency_score == float('nan') or consistency_score < 0.0 or consistency_score > 1.0:
+        consistency_score = parse_number(parsed.get('consistency_score'), _NAN)
+        if not 0.0 <= consistency_score <= 1.0:
             print(f"Warning: Invalid consistency_score: {parsed.get('consistency_score')}. Expected 0.0-1.0 range.")
             return None
-        parsed['consistency_score'] = round(consistency_score, 2)  # 2 decimal places for 0-1 range
+        parsed['consistency_score'] = _round2(consistency_score)  # 2 decimal places for 0-1 range
         
         # Validate status (accept both English and Japanese)
         status = parsed.get('status', '')
-        status_lower = status.lower()
         # Map English to Japanese if needed
-        status_map = {
-            'valid': '妥当',
-            'caution': '注意',
-            're-evaluate': '再評価',
-            'reevaluate': '再評価'
-        }
-        if status_lower in status_map:
-            status = status_map[status_lower]
-        elif status not in ['妥当', '注意', '再評価']:
+        status_lower = status.lower()
+        if status_lower in _STATUS_MAP:
+            status = _STATUS_MAP[status_lower]
+        elif status not in _STATUSES:
             print(f"Warning: Invalid status: {status}")
             return None
         parsed['status'] = status
@@ -147,8 +155,7 @@ class JsonParser:
             return None
         
         # Validate all Q1-Q6 are present
-        for i in range(1, 7):
-            q_id = f"Q{i}"
+        for q_id in _Q_IDS:
             if q_id not in reverse_scores:
                 print(f"Warning: Missing {q_id} in PM05 response")
                 return None
@@ -158,14 +165,89 @@ class JsonParser:
                 return None
             
             # Validate total_score
-            total_score = parse_number(q_data.get('total_score'), float('nan'))
-            if total_score == float('nan') or total_score < 0 or total_score > 5:
+            total_score = parse_number(q_data.get('total_score'), _NAN)
+            if not 0 <= total_score <= 5:
                 print(f"Warning: Invalid total_score for {q_id}: {q_data.get('total_score')}")
                 return None
-            q_data['total_score'] = round(total_score, 2)
+            q_data['total_score'] = _round2(total_score)
         
         return parsed
     
+    def _validate_pm01_raw(self, parsed: Any, question_number: int) -> Optional[Dict[str, Any]]:
+        """Validate a parsed PM01 Raw result for a single question."""
+        if not parsed or not isinstance(parsed, dict):
+            return None
+        
+        # Validate scores and AES components (clarity, logic, relevance) - 1 decimal place
+        if not self._validate_scores(parsed, PM01_RAW_SCORE_KEYS, question_number):
+            return None
+        
+        # Validate evidence and judgment_reason (required)
+        if not parsed.get('evidence') or not parsed.get('judgment_reason'):
+            print(f"Warning: Missing evidence or judgment_reason for Q{question_number}")
+            return None
+        
+        # Add question number for reference
+        parsed['question_number'] = question_number
+        
+        return parsed
+    
+    def _validate_pm05_raw(self, parsed: Any, question_number: int) -> Optional[Dict[str, Any]]:
+        """Validate a parsed PM05 Raw result for a single question."""
+        if not parsed or not isinstance(parsed, dict):
+            return None
+        
+        # Validate scores are numbers (1 decimal place)
+        if not self._validate_scores(parsed, PM05_RAW_SCORE_KEYS, question_number):
+            return None
+        
+        # Validate difference_note (required)
+        if not parsed.get('difference_note'):
+            print(f"Warning: Missing difference_note for Q{question_number}")
+            return None
+        
+        # Add question number for reference
+        parsed['question_number'] = question_number
+        
+        return parsed
+    
+    def _parse_raw_batch_response(self, raw: str, question_numbers: List[int], validate) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Validates every requested question of a combined raw response; None if any is missing or invalid."""
+        parsed = self._parse_with_repair(raw)
+        if not parsed or not isinstance(parsed, dict):
+            return None
+        
+        per_question = parsed.get('per_question')
+        if not isinstance(per_question, dict):
+            print("Warning: Missing per_question in batch raw response")
+            return None
+        
+        results = {}
+        for q_num in question_numbers:
+            q_id = f'Q{q_num}'
+            q_result = validate(per_question.get(q_id), q_num)
+            if not q_result:
+                print(f"Warning: Missing or invalid {q_id} in batch raw response")
+                return None
+            results[q_id] = q_result
+        
+        return results
+    
+    def _validate_scores(self, parsed: Dict[str, Any], score_keys: Tuple[str, ...], question_number: int) -> bool:
+        """Checks that every score key holds a 1.0-5.0 number and rounds it to 1 decimal place."""
+        get = parsed.get
+        for score_key in score_keys:
+            score = get(score_key)
+            # JSON numbers are already float/int; only strings and other values go through parse_number
+            if type(score) is not float and type(score) is not int:
+                score = parse_number(score, _NAN)
+            # NaN fails both comparisons, so it is rejected here as well
+            if not 1.0 <= score <= 5.0:
+                print(f"Warning: Invalid {score_key} for Q{question_number}: {get(score_key)}")
+                return False
+            parsed[score_key] = _round1(score)
+        return True
+    
     def _parse_with_repair(self, raw: str) -> Optional[Any]:
         """Applies heuristic fixes to malformed JSON strings."""
         sanitized = self._strip_json_code_fence(raw)
@@ -180,21 +262,22 @@ class JsonParser:
     
     def _attempt_repair(self, raw: str) -> Optional[Any]:
         """Attempts to fix common JSON formatting issues."""
+        # Only copy the string when there is surrounding whitespace to remove
+        text = raw.strip() if raw and (raw[0].isspace() or raw[-1].isspace()) else raw
+        if not text.startswith('{'):
+            first_brace = text.find('{')
+            if first_brace >= 0:
+                text = text[first_brace:]
+        
+        if not text.endswith('}'):
+            text = text + '}'
+        
+        # Remove trailing commas
+        text = _TRAILING_COMMA_RE.sub(r'\1', text)
+        
         try:
-            text = raw.strip()
-            if not text.startswith('{'):
-                first_brace = text.find('{')
-                if first_brace >= 0:
-                    text = text[first_brace:]
-            
-            if not text.endswith('}'):
-                text = text + '}'
-            
-            # Remove trailing commas
-            text = re.sub(r',(\s*[}\]])', r'\1', text)
-            
-            return json.loads(text)
-        except (json.JSONDecodeError, Exception) as e:
+            return json_loads(text)
+        except json.JSONDecodeError as e:
             print(f"Auto repair failed: {e}")
             return None
     
@@ -203,7 +286,8 @@ class JsonParser:
         if not raw:
             return None
         
-        text = raw.strip()
+        # LLM responses usually arrive without surrounding whitespace; skip the copy then
+        text = raw.strip() if raw[0].isspace() or raw[-1].isspace() else raw
         if not text:
             return None
         
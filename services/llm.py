@@ -2,20 +2,318 @@
 LLM service - handles PM01 and PM05 LLM API calls with strict JSON output.
 """
 
+import functools
+import gzip
+import io
 import json
+import random
+import threading
+import time
+import unicodedata
 import requests
-from typing import Dict, List, Any, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import urlsplit
+from typing import Callable, Dict, List, Any, Optional, Tuple
 from services.json_parser import JsonParser
+from services.llm_cache import LLMResponseCache
 from core.category_mapper import map_to_official_category
+from core.utils import json_dumps_bytes, json_loads, safe_json_parse
+
+# System messages per step
+_PM01_RAW_SYSTEM_MESSAGE = "You are an expert evaluator. Output ONLY valid JSON."
+_PM05_RAW_SYSTEM_MESSAGE = "You are a validation evaluator using reverse logic. Output ONLY valid JSON."
+_PM01_FINAL_SYSTEM_MESSAGE = "You are an expert analyst. Output ONLY valid JSON with all text in Japanese."
+_PM05_FINAL_SYSTEM_MESSAGE = "You are a consistency evaluator. Output ONLY valid JSON with comment field in Japanese."
+_RAW_FUSED_SYSTEM_MESSAGE = "You are an expert evaluator who then validates your own scores using reverse logic. Output ONLY valid JSON."
+
+# Follow-up turn sent once when a response fails JSON parsing/validation (keeps the original prompt prefix)
+_JSON_REASK_MESSAGE = (
+    "Your previous reply was not valid JSON or was missing required fields. "
+    "Return ONLY the corrected JSON object following the Required JSON Schema above, with no other text."
+)
+
+# Static JSON schema blocks, written right after the config instructions at the start of each prompt
+
+# STEP 1: PM01 Raw Scoring
+_PM01_RAW_SCHEMA_BLOCK = """# Required JSON Schema
+{
+  "primary_score": <1.0-5.0 float with 1 decimal place, required - final score for スキル評価（Primary）>,
+  "sub_score": <1.0-5.0 float with 1 decimal place, required - final score for スキル評価（Sub）>,
+  "process_score": <1.0-5.0 float with 1 decimal place, required - final score for PROCESS評価>,
+  "aes_clarity": <1.0-5.0 float with 1 decimal place, required>,
+  "aes_logic": <1.0-5.0 float with 1 decimal place, required>,
+  "aes_relevance": <1.0-5.0 float with 1 decimal place, required>,
+  "evidence": "<string - specific evidence from answer, required>",
+  "judgment_reason": "<string - reason for the scores referencing official criteria. MUST mention any bonus/penalty conditions (+0.1 to +0.5 or -0.1 to -0.5) applied to PRIMARY/SUB/PROCESS scores, required>"
+}"""
+
+# STEP 2: PM05 Raw Scoring (reverse logic)
+_PM05_RAW_SCHEMA_BLOCK = """# Required Output JSON Schema
+{
+  "primary_score": <1.0-5.0 float with 1 decimal place, required - your reverse logic evaluation score>,
+  "sub_score": <1.0-5.0 float with 1 decimal place, required - your reverse logic evaluation score>,
+  "process_score": <1.0-5.0 float with 1 decimal place, required - your reverse logic evaluation score>,
+  "difference_note": "<string in Japanese - detailed explanation covering: your reverse logic evaluation approach, comparison with PM01 Raw scores, any inconsistencies/contradictions/issues detected, explanation of score differences (if any), consistency assessment for this question, required>"
+}"""
+
+# STEP 3: PM01 Final (analysis)
+_PM01_FINAL_SCHEMA_BLOCK = """# Required JSON Schema
+{
+  "overall_summary": "<comprehensive summary of the diagnosis>",
+  "ai_use_level": "<基礎|標準|高度>",
+  "recommendations": ["<recommendation1>", "<recommendation2>", ...]
+}"""
+
+# STEP 4: PM05 Final (consistency check)
+_PM05_FINAL_SCHEMA_BLOCK = """# Required JSON Schema
+{
+  "consistency_score": <0.0-1.0 float with 2 decimal places, required - calculated as 1 - (score_std / 2.5), where score_std is standard deviation of PRIMARY/SUB/PROCESS scores across Q1-Q6>,
+  "status": "<妥当|注意|再評価>",
+  "detected_issues": ["<issue1 in Japanese>", "<issue2 in Japanese>", ...],
+  "comment": "<string in Japanese, 80-120 characters - consistency evaluation, score trends, re-diagnosis recommendation if needed, required>"
+}"""
+
+# Column header for the compact per-question score rows in the PM05 Final prompt
+_PER_QUESTION_HEADER = "Question | Primary | Sub | Process | AES | AES_Clarity | AES_Logic | AES_Relevance"
+
+# Combined Q1-Q6 variants of the raw scoring schemas (one request per respondent)
+_BATCH_SCHEMA_NOTE = (
+    'Return one JSON object of the form {"per_question": {"Q1": {...}, "Q2": {...}, ...}} '
+    'with an entry for every question below. Each entry follows this schema:\n'
+)
+_PM01_RAW_BATCH_SCHEMA_BLOCK = "# Required JSON Schema\n" + _BATCH_SCHEMA_NOTE + _PM01_RAW_SCHEMA_BLOCK.split("\n", 1)[1]
+_PM05_RAW_BATCH_SCHEMA_BLOCK = "# Required Output JSON Schema\n" + _BATCH_SCHEMA_NOTE + _PM05_RAW_SCHEMA_BLOCK.split("\n", 1)[1]
+
+# STEP 1 + STEP 2 in one request per question (PM01 result first, then PM05 scored against it)
+_RAW_FUSED_SCHEMA_BLOCK = (
+    "# Required JSON Schema\n"
+    'Return one JSON object of the form {"pm01": {...}, "pm05": {...}}. '
+    'Fill "pm01" first using the Evaluation Instructions, then "pm05" using the Reverse Logic Evaluation Instructions, '
+    'treating your "pm01" scores as the PM01 Raw Scoring Result to compare against.\n'
+    '"pm01" follows this schema:\n' + _PM01_RAW_SCHEMA_BLOCK.split("\n", 1)[1] + "\n"
+    '"pm05" follows this schema:\n' + _PM05_RAW_SCHEMA_BLOCK.split("\n", 1)[1]
+)
+
+
+def _strict_object(properties: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON Schema object with every property required and no extra keys (as strict mode requires)."""
+    return {'type': 'object', 'properties': properties, 'required': list(properties), 'additionalProperties': False}
+
+
+def _json_schema_format(name: str, schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Chat Completions response_format for a strict JSON Schema."""
+    return {'type': 'json_schema', 'json_schema': {'name': name, 'schema': schema, 'strict': True}}
+
+
+# Strict JSON Schemas for structured outputs (llmStructuredOutputs); they mirror the schema blocks above
+_NUMBER = {'type': 'number'}
+_STRING = {'type': 'string'}
+_STRING_LIST = {'type': 'array', 'items': _STRING}
+
+_PM01_RAW_JSON_SCHEMA = _strict_object({
+    'primary_score': _NUMBER,
+    'sub_score': _NUMBER,
+    'process_score': _NUMBER,
+    'aes_clarity': _NUMBER,
+    'aes_logic': _NUMBER,
+    'aes_relevance': _NUMBER,
+    'evidence': _STRING,
+    'judgment_reason': _STRING
+})
+_PM05_RAW_JSON_SCHEMA = _strict_object({
+    'primary_score': _NUMBER,
+    'sub_score': _NUMBER,
+    'process_score': _NUMBER,
+    'difference_note': _STRING
+})
+
+_PM01_RAW_RESPONSE_FORMAT = _json_schema_format('pm01_raw', _PM01_RAW_JSON_SCHEMA)
+_PM05_RAW_RESPONSE_FORMAT = _json_schema_format('pm05_raw', _PM05_RAW_JSON_SCHEMA)
+_RAW_FUSED_RESPONSE_FORMAT = _json_schema_format(
+    'pm01_pm05_raw',
+    _strict_object({'pm01': _PM01_RAW_JSON_SCHEMA, 'pm05': _PM05_RAW_JSON_SCHEMA})
+)
+_PM01_FINAL_RESPONSE_FORMAT = _json_schema_format('pm01_final', _strict_object({
+    'overall_summary': _STRING,
+    'ai_use_level': {'type': 'string', 'enum': ['基礎', '標準', '高度']},
+    'recommendations': _STRING_LIST
+}))
+_PM05_FINAL_RESPONSE_FORMAT = _json_schema_format('pm05_final', _strict_object({
+    'consistency_score': _NUMBER,
+    'status': {'type': 'string', 'enum': ['妥当', '注意', '再評価']},
+    'detected_issues': _STRING_LIST,
+    'comment': _STRING
+}))
+
+
+@functools.lru_cache(maxsize=8)
+def _raw_batch_response_format(name: str, question_numbers: Tuple[int, ...]) -> Dict[str, Any]:
+    """response_format for a combined Q1-Q6 raw scoring request (per_question.Qn entries)."""
+    question_schema = _PM01_RAW_JSON_SCHEMA if name == 'pm01_raw_batch' else _PM05_RAW_JSON_SCHEMA
+    per_question = _strict_object({f"Q{q_num}": question_schema for q_num in question_numbers})
+    return _json_schema_format(name, _strict_object({'per_question': per_question}))
+
+
+def _fmt_scores(scores: Dict[str, Any]) -> str:
+    """Compact "name=value, ..." rendering of a score dict for prompts (fewer tokens than the dict repr)."""
+    return ", ".join(f"{name}={value}" for name, value in scores.items())
+
+
+class _JitteredRetry(Retry):
+    """urllib3 Retry with random jitter added to the exponential backoff (Retry-After is still honoured)."""
+    
+    def get_backoff_time(self) -> float:
+        backoff = super().get_backoff_time()
+        return backoff + random.uniform(0, backoff) if backoff > 0 else 0
+
+
+class _RateLimiter:
+    """Thread-safe limiter that spaces requests evenly to stay under a requests-per-minute budget."""
+    
+    __slots__ = ('interval', '_next_slot', '_lock')
+    
+    def __init__(self, requests_per_minute: int):
+        self.interval = 60.0 / requests_per_minute
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        """Blocks until the caller may send the next request."""
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+class _JsonObjectScanner:
+    """Incrementally tracks brace depth (outside of strings) to detect when a streamed top-level JSON object closes."""
+    
+    __slots__ = ('depth', 'started', 'in_string', 'escaped')
+    
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+    
+    def feed(self, text: str) -> int:
+        """Consumes the next chunk; returns the end offset of the top-level object within it once complete, else -1."""
+        for i, ch in enumerate(text):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == '\\':
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch == '{':
+                self.depth += 1
+                self.started = True
+            elif ch == '}':
+                self.depth -= 1
+                if self.started and self.depth == 0:
+                    return i + 1
+        return -1
+
+
+# Process-wide connection pool: the web app builds an LLMService per request, and each one reuses
+# the already-open keep-alive connections (and their DNS/TLS setup) instead of starting a new pool.
+# Sized for the concurrent per-question calls; 429/5xx are retried with jittered backoff.
+_SHARED_ADAPTER = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=16,
+    max_retries=_JitteredRetry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=frozenset(['GET', 'POST']),
+        raise_on_status=False
+    )
+)
 
 
 class LLMService:
     """Service for interacting with LLM APIs for PM01 and PM05."""
     
+    # Fixed attribute set: no per-instance __dict__, slot access on the hot request path
+    __slots__ = (
+        'config', 'json_parser',
+        'api_key', 'provider', 'api_url', 'model', 'headers',
+        'response_cache', 'share_answer_cache', 'structured_outputs', 'gzip_requests', 'gzip_headers', 'pm05_final_model', '_pm05_final_example', 'session', 'request_slots', 'rate_limiter', 'stream',
+        '_scored_questions', '_static_prefixes', '_question_prefixes', '_answer_blocks'
+    )
+    
+    # Sampling temperature for every request; 0 keeps scoring deterministic (and cacheable)
+    TEMPERATURE = 0
+    
     def __init__(self, config: Dict[str, Any]):
         """Initialize the LLM service with configuration."""
         self.config = config
         self.json_parser = JsonParser()
+        
+        # Resolve API settings once (fail fast on missing configuration instead of on every call)
+        self.api_key = config.get('llmApiKey')
+        if not self.api_key:
+            raise ValueError("API key not configured. Add llmApiKey to the Config sheet in your Google Spreadsheet.")
+        self.provider = config.get('llmProvider')
+        if not self.provider:
+            raise ValueError("llmProvider not configured in Config sheet.")
+        self.api_url = config.get('llmApiUrl')
+        if not self.api_url:
+            raise ValueError("llmApiUrl not configured in Config sheet.")
+        self.model = config.get('llmModel')
+        if not self.model:
+            raise ValueError("llmModel not configured in Config sheet.")
+        # STEP 4 mostly restates PM01 Final, so it can run on a cheaper model (llmModelPM05Final)
+        self.pm05_final_model = config.get('llmModelPM05Final') or self.model
+        # First validated (prompt, response) of STEP 4, reused as a one-shot example for the cheaper model
+        self._pm05_final_example = None
+        # Per-call headers for chat requests; Authorization lives on the session (set once below)
+        self.headers = {'Content-Type': 'application/json'}
+        # Opt-in gzip request bodies (prompts are mostly repeated instruction/schema text)
+        self.gzip_requests = bool(config.get('llmGzipRequests'))
+        self.gzip_headers = {'Content-Type': 'application/json', 'Content-Encoding': 'gzip'}
+        
+        # Exact-match response cache (temperature 0 makes responses deterministic); TTL 0 disables it
+        # Only deterministic (temperature 0) responses are cacheable
+        cache_ttl = config.get('llmCacheTtl', 0)
+        self.response_cache = None
+        if cache_ttl > 0 and self.TEMPERATURE == 0:
+            self.response_cache = LLMResponseCache(config.get('llmCachePath') or '.llm_cache.sqlite3', cache_ttl)
+        # Opt-in: reuse PM01/PM05 raw responses across respondents whose normalized answers are identical
+        self.share_answer_cache = bool(self.response_cache and config.get('llmSharedAnswerCache'))
+        
+        # One keep-alive session for all calls (avoids a TCP/TLS handshake per request).
+        # Its adapter (connection pool) is shared by every LLMService in the process.
+        self.session = requests.Session()
+        # Content-Type stays per call so Files API uploads can send multipart bodies
+        self.session.headers['Authorization'] = f'Bearer {self.api_key}'
+        self.session.mount('https://', _SHARED_ADAPTER)
+        self.session.mount('http://', _SHARED_ADAPTER)
+        
+        # Caps in-flight requests across all threads, and optionally paces them to llmRpm
+        self.request_slots = threading.BoundedSemaphore(max(1, config.get('llmMaxConcurrency') or 1))
+        llm_rpm = config.get('llmRpm', 0)
+        self.rate_limiter = _RateLimiter(llm_rpm) if llm_rpm > 0 else None
+        
+        # Opt-in SSE streaming: stop reading as soon as the JSON object is complete
+        self.stream = bool(config.get('llmStream'))
+        # Opt-in strict JSON Schema output (model must support structured outputs); json_object otherwise
+        self.structured_outputs = bool(config.get('llmStructuredOutputs'))
+        
+        # (questions list, its Q1-Q6 (index, question) pairs) - see _select_scored_questions
+        self._scored_questions = None
+        # schema block -> (prompt text, instructions + schema prefix) - see _static_prefix
+        self._static_prefixes = {}
+        # (schema block, id(question)) -> (question, static prompt prefix) - see _static_question_prefix
+        self._question_prefixes = {}
+        # (respondent ID, {(name, answer, reason): block}) for the respondent being scored - see _respondent_answer_block
+        self._answer_blocks = (None, {})
     
     def _map_to_official_category(self, category: str, category_type: str) -> Optional[str]:
         """Map question sheet category to official category (delegates to shared mapper)."""
@@ -35,12 +333,14 @@ class LLMService:
         """
         prompt = self._build_pm01_raw_prompt(respondent, question, question_index)
         
-        response = self._invoke_llm(prompt, attempt, "You are an expert evaluator. Output ONLY valid JSON.")
-        if not response:
-            return None
-        
-        parsed = self.json_parser.parse_pm01_raw_response(response, question['number'])
-        return parsed
+        return self._invoke_and_parse(
+            prompt,
+            attempt,
+            _PM01_RAW_SYSTEM_MESSAGE,
+            lambda response: self.json_parser.parse_pm01_raw_response(response, question['number']),
+            cache_text=self._shared_answer_cache_text(prompt, respondent) if self.share_answer_cache else None,
+            response_format=_PM01_RAW_RESPONSE_FORMAT
+        )
     
     def run_pm05_raw_scoring(
         self,
@@ -57,12 +357,96 @@ class LLMService:
         """
         prompt = self._build_pm05_raw_prompt(respondent, question, question_index, pm01_raw_result)
         
-        response = self._invoke_llm(prompt, attempt, "You are a validation evaluator using reverse logic. Output ONLY valid JSON.")
-        if not response:
-            return None
+        return self._invoke_and_parse(
+            prompt,
+            attempt,
+            _PM05_RAW_SYSTEM_MESSAGE,
+            lambda response: self.json_parser.parse_pm05_raw_response(response, question['number']),
+            cache_text=self._shared_answer_cache_text(prompt, respondent) if self.share_answer_cache else None,
+            response_format=_PM05_RAW_RESPONSE_FORMAT
+        )
+    
+    def run_raw_scoring_fused(
+        self,
+        respondent: Dict[str, Any],
+        question: Dict[str, Any],
+        question_index: int,
+        attempt: int
+    ) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        STEP 1 + STEP 2 (fused): PM01 Raw and PM05 Raw Scoring of one question in a single request.
         
-        parsed = self.json_parser.parse_pm05_raw_response(response, question['number'])
-        return parsed
+        Returns {'pm01_raw_result': ..., 'pm05_raw_result': ...} with the same results as the two separate calls.
+        """
+        prompt = self._build_raw_fused_prompt(respondent, question, question_index)
+        
+        return self._invoke_and_parse(
+            prompt,
+            attempt,
+            _RAW_FUSED_SYSTEM_MESSAGE,
+            lambda response: self.json_parser.parse_raw_fused_response(response, question['number']),
+            cache_text=self._shared_answer_cache_text(prompt, respondent) if self.share_answer_cache else None,
+            response_format=_RAW_FUSED_RESPONSE_FORMAT
+        )
+    
+    def run_pm01_raw_scoring_batch(
+        self,
+        respondent: Dict[str, Any],
+        questions: List[Dict[str, Any]],
+        attempt: int
+    ) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        STEP 1 (batched): PM01 Raw Scoring of Q1-Q6 in a single request.
+        
+        Returns dict mapping Q1-Q6 to the same per-question results as run_pm01_raw_scoring.
+        """
+        indexed_questions = self._select_scored_questions(questions)
+        question_numbers = [question['number'] for _, question in indexed_questions]
+        prompt = self._build_pm01_raw_batch_prompt(respondent, indexed_questions)
+        
+        return self._invoke_and_parse(
+            prompt,
+            attempt,
+            _PM01_RAW_SYSTEM_MESSAGE,
+            lambda response: self.json_parser.parse_pm01_raw_batch_response(response, question_numbers),
+            response_format=_raw_batch_response_format('pm01_raw_batch', tuple(question_numbers))
+        )
+    
+    def run_pm05_raw_scoring_batch(
+        self,
+        respondent: Dict[str, Any],
+        questions: List[Dict[str, Any]],
+        pm01_raw_results: Dict[str, Dict[str, Any]],
+        attempt: int
+    ) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        STEP 2 (batched): PM05 Raw Scoring of Q1-Q6 in a single request.
+        
+        Returns dict mapping Q1-Q6 to the same per-question results as run_pm05_raw_scoring.
+        """
+        indexed_questions = self._select_scored_questions(questions)
+        question_numbers = [question['number'] for _, question in indexed_questions]
+        prompt = self._build_pm05_raw_batch_prompt(respondent, indexed_questions, pm01_raw_results)
+        
+        return self._invoke_and_parse(
+            prompt,
+            attempt,
+            _PM05_RAW_SYSTEM_MESSAGE,
+            lambda response: self.json_parser.parse_pm05_raw_batch_response(response, question_numbers),
+            response_format=_raw_batch_response_format('pm05_raw_batch', tuple(question_numbers))
+        )
+    
+    def _select_scored_questions(self, questions: List[Dict[str, Any]]) -> List[Tuple[int, Dict[str, Any]]]:
+        """Returns (answer index, question) pairs for the scored questions Q1-Q6 (memoized per questions list)."""
+        # The questionnaire is read once per run, so the same list object comes back on every call.
+        # Keeping a reference to it (not just its id) guarantees the identity check cannot be fooled.
+        cached = self._scored_questions
+        if cached is not None and cached[0] is questions:
+            return cached[1]
+        
+        selected = [(i, question) for i, question in enumerate(questions) if 1 <= question['number'] <= 6]
+        self._scored_questions = (questions, selected)
+        return selected
     
     def run_pm01_final_analysis(
         self,
@@ -78,12 +462,13 @@ class LLMService:
         """
         prompt = self._build_pm01_final_prompt(respondent, pm05_raw_results, aggregated_scores)
         
-        response = self._invoke_llm(prompt, attempt, "You are an expert analyst. Output ONLY valid JSON with all text in Japanese.")
-        if not response:
-            return None
-        
-        parsed = self.json_parser.parse_pm01_final_response(response)
-        return parsed
+        return self._invoke_and_parse(
+            prompt,
+            attempt,
+            _PM01_FINAL_SYSTEM_MESSAGE,
+            self.json_parser.parse_pm01_final_response,
+            response_format=_PM01_FINAL_RESPONSE_FORMAT
+        )
     
     def run_pm05_final_check(
         self,
@@ -97,13 +482,47 @@ class LLMService:
         Returns structured JSON with consistency evaluation.
         """
         prompt = self._build_pm05_final_prompt(respondent, pm01_final)
+        model = self.pm05_final_model
+        cheaper_model = model != self.model
         
-        response = self._invoke_llm(prompt, attempt, "You are a consistency evaluator. Output ONLY valid JSON with comment field in Japanese.")
-        if not response:
-            return None
+        result = self._invoke_and_parse(
+            prompt,
+            attempt,
+            _PM05_FINAL_SYSTEM_MESSAGE,
+            self.json_parser.parse_pm05_final_response,
+            response_format=_PM05_FINAL_RESPONSE_FORMAT,
+            model=model,
+            examples=self._pm05_final_example if cheaper_model else None
+        )
         
-        parsed = self.json_parser.parse_pm05_final_response(response)
-        return parsed
+        # The example stays fixed for the run, so [system, example, ...] remains a cacheable prompt prefix
+        if result and cheaper_model and self._pm05_final_example is None:
+            example_response = {key: result.get(key) for key in ('consistency_score', 'status', 'detected_issues', 'comment')}
+            self._pm05_final_example = [
+                {'role': 'user', 'content': prompt},
+                {'role': 'assistant', 'content': json_dumps_bytes(example_response).decode('utf-8')}
+            ]
+        
+        return result
+    
+    def run_report_analysis(self, prompt: str, system_message: str) -> Optional[Dict[str, Any]]:
+        """
+        Free-form analysis for individual and organization reports.
+        
+        Returns the parsed JSON object (any keys), or None when every attempt (up to maxRetries) failed.
+        Goes through the response cache, so regenerating an unchanged report reuses the analysis.
+        """
+        max_retries = max(1, self.config.get('maxRetries') or 1)
+        for attempt in range(1, max_retries + 1):
+            try:
+                parsed = self._invoke_and_parse(prompt, attempt, system_message, safe_json_parse)
+                if parsed:
+                    return parsed
+            except Exception as e:
+                print(f"    Error in report analysis attempt {attempt}: {e}")
+                if attempt >= max_retries:
+                    raise
+        return None
     
     def _build_pm01_raw_prompt(
         self,
@@ -112,151 +531,266 @@ class LLMService:
         question_index: int
     ) -> str:
         """Build PM01 Raw Scoring prompt for a single question."""
-        lines = []
+        # Get prompt from config sheet (required for STEP 1)
+        prompt_text = self.config.get('promptPM1Raw', '').strip()
+        if not prompt_text:
+            raise ValueError("promptPM1Raw not configured in Config sheet. Required for STEP 1 (PM01 Raw Scoring).")
         
-        lines.append("# Respondent Information")
-        lines.append(f"ID: {respondent['id']}")
-        lines.append(f"Name: {respondent['name']}")
-        lines.append("")
+        buf = io.StringIO()
+        w = buf.write
         
-        # Single question, answer, and reason
-        question_id = f"Q{question['number']}"
-        answer = respondent['answers'][question_index] if question_index < len(respondent['answers']) else ""
-        reason = respondent.get('reasons', [])
-        reason_text = reason[question_index] if question_index < len(reason) else ""
+        # Static content first (instructions, schema, question - identical across respondents),
+        # so the API can reuse the cached prefix; it is built once per question
+        w(self._static_question_prefix("# Evaluation Instructions\n", prompt_text, _PM01_RAW_SCHEMA_BLOCK, question))
         
-        lines.append(f"# Question {question_id}")
-        lines.append(f"Question: {question['questionText']}")
-        lines.append(f"Answer: {answer or '(無回答)'}")
-        if reason_text:
-            lines.append(f"選択理由（AI分析用）: {reason_text}")
+        # Respondent-specific content last
+        self._write_respondent_answer(w, respondent, question_index)
         
-        # Add category information if available (use mapped official categories)
-        question_primary_cat = question.get('primary_category', '')
-        question_sub_cat = question.get('sub_category', '')
-        question_process_cat = question.get('process_category', '')
+        return buf.getvalue()
+    
+    def _build_pm05_raw_prompt(
+        self,
+        respondent: Dict[str, Any],
+        question: Dict[str, Any],
+        question_index: int,
+        pm01_raw_result: Dict[str, Any]
+    ) -> str:
+        """Build PM05 Raw Scoring prompt using reverse logic."""
+        # Get prompt from config sheet (required for STEP 2)
+        prompt_text = self.config.get('promptPM5Raw', '').strip()
+        if not prompt_text:
+            raise ValueError("promptPM5Raw not configured in Config sheet. Required for STEP 2 (PM05 Raw Scoring).")
         
-        # Map to official categories
-        primary_cat = self._map_to_official_category(question_primary_cat, 'primary')
-        sub_cat = self._map_to_official_category(question_sub_cat, 'sub')
-        process_cat = self._map_to_official_category(question_process_cat, 'process')
+        buf = io.StringIO()
+        w = buf.write
         
-        if primary_cat or sub_cat or process_cat:
-            lines.append("")
-            lines.append("# Evaluation Categories")
-            if primary_cat:
-                lines.append(f"PRIMARY Category: {primary_cat}")
-            if sub_cat:
-                lines.append(f"SUB Category: {sub_cat}")
-            if process_cat:
-                lines.append(f"PROCESS Category: {process_cat}")
+        # Static content first (instructions, schema, question - identical across respondents),
+        # so the API can reuse the cached prefix; it is built once per question
+        w(self._static_question_prefix("# Reverse Logic Evaluation Instructions\n", prompt_text, _PM05_RAW_SCHEMA_BLOCK, question))
+        
+        # Respondent-specific content last
+        self._write_respondent_answer(w, respondent, question_index)
+        
+        # Include PM01 raw scoring result
+        w("\n# PM01 Raw Scoring Result (Reference)\n")
+        self._write_pm01_raw_reference(w, pm01_raw_result)
+        
+        return buf.getvalue()
+    
+    def _build_raw_fused_prompt(
+        self,
+        respondent: Dict[str, Any],
+        question: Dict[str, Any],
+        question_index: int
+    ) -> str:
+        """Build a combined PM01 + PM05 Raw Scoring prompt for a single question."""
+        # Both config prompts are required (STEP 1 and STEP 2)
+        pm01_prompt_text = self.config.get('promptPM1Raw', '').strip()
+        if not pm01_prompt_text:
+            raise ValueError("promptPM1Raw not configured in Config sheet. Required for STEP 1 (PM01 Raw Scoring).")
+        pm05_prompt_text = self.config.get('promptPM5Raw', '').strip()
+        if not pm05_prompt_text:
+            raise ValueError("promptPM5Raw not configured in Config sheet. Required for STEP 2 (PM05 Raw Scoring).")
+        
+        buf = io.StringIO()
+        w = buf.write
+        
+        # Static content first (both instruction sets, schema, question), built once per question
+        w(self._static_question_prefix(
+            "# Evaluation Instructions\n",
+            f"{pm01_prompt_text}\n\n# Reverse Logic Evaluation Instructions\n{pm05_prompt_text}",
+            _RAW_FUSED_SCHEMA_BLOCK,
+            question
+        ))
         
-        lines.append("")
+        # Respondent-specific content last
+        self._write_respondent_answer(w, respondent, question_index)
         
+        return buf.getvalue()
+    
+    def _build_pm01_raw_batch_prompt(
+        self,
+        respondent: Dict[str, Any],
+        indexed_questions: List[Tuple[int, Dict[str, Any]]]
+    ) -> str:
+        """Build a single PM01 Raw Scoring prompt covering all given questions."""
         # Get prompt from config sheet (required for STEP 1)
         prompt_text = self.config.get('promptPM1Raw', '').strip()
         if not prompt_text:
             raise ValueError("promptPM1Raw not configured in Config sheet. Required for STEP 1 (PM01 Raw Scoring).")
         
-        lines.append("# Evaluation Instructions")
-        lines.append(prompt_text)
-        lines.append("")
+        buf = io.StringIO()
+        w = buf.write
         
-        lines.append("# Required JSON Schema")
-        lines.append("""{
-  "primary_score": <1.0-5.0 float with 1 decimal place, required - final score for スキル評価（Primary）>,
-  "sub_score": <1.0-5.0 float with 1 decimal place, required - final score for スキル評価（Sub）>,
-  "process_score": <1.0-5.0 float with 1 decimal place, required - final score for PROCESS評価>,
-  "aes_clarity": <1.0-5.0 float with 1 decimal place, required>,
-  "aes_logic": <1.0-5.0 float with 1 decimal place, required>,
-  "aes_relevance": <1.0-5.0 float with 1 decimal place, required>,
-  "evidence": "<string - specific evidence from answer, required>",
-  "judgment_reason": "<string - reason for the scores referencing official criteria. MUST mention any bonus/penalty conditions (+0.1 to +0.5 or -0.1 to -0.5) applied to PRIMARY/SUB/PROCESS scores, required>"
-}""")
+        # Static content first (identical across respondents) so the API can reuse the cached prefix
+        w(self._static_prefix("# Evaluation Instructions\n", prompt_text, _PM01_RAW_BATCH_SCHEMA_BLOCK))
+        
+        for _, question in indexed_questions:
+            self._write_question(w, question)
         
-        return "\n".join(lines)
+        # Respondent-specific content last
+        self._write_respondent_answers(w, respondent, indexed_questions)
+        
+        return buf.getvalue()
     
-    def _build_pm05_raw_prompt(
+    def _build_pm05_raw_batch_prompt(
         self,
         respondent: Dict[str, Any],
-        question: Dict[str, Any],
-        question_index: int,
-        pm01_raw_result: Dict[str, Any]
+        indexed_questions: List[Tuple[int, Dict[str, Any]]],
+        pm01_raw_results: Dict[str, Dict[str, Any]]
     ) -> str:
-        """Build PM05 Raw Scoring prompt using reverse logic."""
-        lines = []
+        """Build a single PM05 Raw Scoring prompt covering all given questions."""
+        # Get prompt from config sheet (required for STEP 2)
+        prompt_text = self.config.get('promptPM5Raw', '').strip()
+        if not prompt_text:
+            raise ValueError("promptPM5Raw not configured in Config sheet. Required for STEP 2 (PM05 Raw Scoring).")
         
-        lines.append("# Respondent Information")
-        lines.append(f"ID: {respondent['id']}")
-        lines.append(f"Name: {respondent['name']}")
-        lines.append("")
+        buf = io.StringIO()
+        w = buf.write
         
-        # Single question, answer, and reason
-        question_id = f"Q{question['number']}"
-        answer = respondent['answers'][question_index] if question_index < len(respondent['answers']) else ""
-        reason = respondent.get('reasons', [])
-        reason_text = reason[question_index] if question_index < len(reason) else ""
+        # Static content first (identical across respondents) so the API can reuse the cached prefix
+        w(self._static_prefix("# Reverse Logic Evaluation Instructions\n", prompt_text, _PM05_RAW_BATCH_SCHEMA_BLOCK))
         
-        lines.append(f"# Question {question_id}")
-        lines.append(f"Question: {question['questionText']}")
-        lines.append(f"Answer: {answer or '(無回答)'}")
-        if reason_text:
-            lines.append(f"選択理由（AI分析用）: {reason_text}")
+        for _, question in indexed_questions:
+            self._write_question(w, question)
         
-        # Add category information if available (use mapped official categories)
-        question_primary_cat = question.get('primary_category', '')
-        question_sub_cat = question.get('sub_category', '')
-        question_process_cat = question.get('process_category', '')
+        # Respondent-specific content last
+        self._write_respondent_answers(w, respondent, indexed_questions)
+        
+        # Include PM01 raw scoring results
+        w("\n# PM01 Raw Scoring Results (Reference)\n")
+        for _, question in indexed_questions:
+            question_id = f"Q{question['number']}"
+            w(f"## {question_id}\n")
+            self._write_pm01_raw_reference(w, pm01_raw_results.get(question_id, {}))
+        
+        return buf.getvalue()
+    
+    def _static_prefix(self, instructions_header: str, prompt_text: str, schema_block: str) -> str:
+        """Returns the instructions + schema block that starts every prompt of a step, built once per step."""
+        cached = self._static_prefixes.get(schema_block)
+        if cached is not None and cached[0] == prompt_text:
+            return cached[1]
+        
+        prefix = f"{instructions_header}{prompt_text}\n\n{schema_block}\n\n"
+        self._static_prefixes[schema_block] = (prompt_text, prefix)
+        return prefix
+    
+    def _static_question_prefix(
+        self,
+        instructions_header: str,
+        prompt_text: str,
+        schema_block: str,
+        question: Dict[str, Any]
+    ) -> str:
+        """Returns the respondent-independent start of a per-question prompt, memoized per step and question."""
+        # The schema block is a per-step module constant, so it identifies the step
+        key = (schema_block, id(question))
+        cached = self._question_prefixes.get(key)
+        # The cached entry keeps the question dict alive, so its id cannot be reused by another dict
+        if cached is not None and cached[0] is question:
+            return cached[1]
+        
+        buf = io.StringIO()
+        w = buf.write
+        w(self._static_prefix(instructions_header, prompt_text, schema_block))
+        
+        # Question text and categories (shared by all respondents in a run)
+        self._write_question(w, question)
+        
+        prefix = buf.getvalue()
+        self._question_prefixes[key] = (question, prefix)
+        return prefix
+    
+    def _write_question(self, w: Callable[[str], int], question: Dict[str, Any]) -> None:
+        """Writes the question text and its mapped official categories (if any) to a prompt buffer."""
+        w(f"# Question Q{question['number']}\n")
+        w(f"Question: {question['questionText']}\n")
         
         # Map to official categories
-        primary_cat = self._map_to_official_category(question_primary_cat, 'primary')
-        sub_cat = self._map_to_official_category(question_sub_cat, 'sub')
-        process_cat = self._map_to_official_category(question_process_cat, 'process')
+        primary_cat = self._map_to_official_category(question.get('primary_category', ''), 'primary')
+        sub_cat = self._map_to_official_category(question.get('sub_category', ''), 'sub')
+        process_cat = self._map_to_official_category(question.get('process_category', ''), 'process')
         
         if primary_cat or sub_cat or process_cat:
-            lines.append("")
-            lines.append("# Evaluation Categories")
+            w("\n# Evaluation Categories\n")
             if primary_cat:
-                lines.append(f"PRIMARY Category: {primary_cat}")
+                w(f"PRIMARY Category: {primary_cat}\n")
             if sub_cat:
-                lines.append(f"SUB Category: {sub_cat}")
+                w(f"SUB Category: {sub_cat}\n")
             if process_cat:
-                lines.append(f"PROCESS Category: {process_cat}")
+                w(f"PROCESS Category: {process_cat}\n")
         
-        lines.append("")
+        w("\n")
+    
+    def _write_respondent_answer(self, w: Callable[[str], int], respondent: Dict[str, Any], question_index: int) -> None:
+        """Writes the respondent information with the answer and reason for one question to a prompt buffer."""
+        answers = respondent['answers']
+        answer = answers[question_index] if question_index < len(answers) else ""
+        reason = respondent.get('reasons', [])
+        reason_text = reason[question_index] if question_index < len(reason) else ""
         
-        # Include PM01 raw scoring result
-        lines.append("# PM01 Raw Scoring Result (Reference)")
-        lines.append(f"Primary Score: {pm01_raw_result.get('primary_score', 0)}")
-        lines.append(f"Sub Score: {pm01_raw_result.get('sub_score', 0)}")
-        lines.append(f"Process Score: {pm01_raw_result.get('process_score', 0)}")
-        lines.append(f"AES Clarity: {pm01_raw_result.get('aes_clarity', 0)}")
-        lines.append(f"AES Logic: {pm01_raw_result.get('aes_logic', 0)}")
-        lines.append(f"AES Relevance: {pm01_raw_result.get('aes_relevance', 0)}")
-        aes_score = (pm01_raw_result.get('aes_clarity', 0) + pm01_raw_result.get('aes_logic', 0) + pm01_raw_result.get('aes_relevance', 0)) / 3 if (pm01_raw_result.get('aes_clarity', 0) + pm01_raw_result.get('aes_logic', 0) + pm01_raw_result.get('aes_relevance', 0)) > 0 else 0
-        lines.append(f"AES Score (Average): {round(aes_score, 1)}")
-        lines.append(f"Evidence: {pm01_raw_result.get('evidence', '')}")
-        lines.append(f"Judgment Reason: {pm01_raw_result.get('judgment_reason', '')}")
-        lines.append("")
-        
-        # Get prompt from config sheet
-        prompt_text = self.config.get('promptPM5Raw', '').strip()
-        if prompt_text:
-            lines.append("# Reverse Logic Evaluation Instructions")
-            lines.append(prompt_text)
-            lines.append("")
-        else:
-            raise ValueError("promptPM5Raw not configured in Config sheet. Required for STEP 2 (PM05 Raw Scoring).")
+        w(self._respondent_answer_block(respondent['id'], respondent['name'], answer, reason_text))
+    
+    def _respondent_answer_block(self, respondent_id: Any, name: Any, answer: str, reason_text: str) -> str:
+        """
+        Respondent section of a per-question prompt; shared by retries and by the PM01/PM05 raw passes.
         
-        lines.append("# Required Output JSON Schema")
-        lines.append("""{
-  "primary_score": <1.0-5.0 float with 1 decimal place, required - your reverse logic evaluation score>,
-  "sub_score": <1.0-5.0 float with 1 decimal place, required - your reverse logic evaluation score>,
-  "process_score": <1.0-5.0 float with 1 decimal place, required - your reverse logic evaluation score>,
-  "difference_note": "<string in Japanese - detailed explanation covering: your reverse logic evaluation approach, comparison with PM01 Raw scores, any inconsistencies/contradictions/issues detected, explanation of score differences (if any), consistency assessment for this question, required>"
-}""")
+        Only the current respondent's blocks are kept, so answers are not held once scoring moves on.
+        """
+        blocks_id, blocks = self._answer_blocks
+        if blocks_id != respondent_id:
+            blocks = {}
+            self._answer_blocks = (respondent_id, blocks)
+        key = (name, answer, reason_text)
+        block = blocks.get(key)
+        if block is None:
+            block = f"# Respondent Information\nID: {respondent_id}\nName: {name}\nAnswer: {answer or '(無回答)'}\n"
+            if reason_text:
+                block += f"選択理由（AI分析用）: {reason_text}\n"
+            blocks[key] = block
+        return block
+    
+    def _write_respondent_answers(
+        self,
+        w: Callable[[str], int],
+        respondent: Dict[str, Any],
+        indexed_questions: List[Tuple[int, Dict[str, Any]]]
+    ) -> None:
+        """Writes the respondent information with the answers and reasons for several questions to a prompt buffer."""
+        answers = respondent['answers']
+        reason = respondent.get('reasons', [])
         
-        return "\n".join(lines)
+        w("# Respondent Information\n")
+        w(f"ID: {respondent['id']}\n")
+        w(f"Name: {respondent['name']}\n")
+        for question_index, question in indexed_questions:
+            question_id = f"Q{question['number']}"
+            answer = answers[question_index] if question_index < len(answers) else ""
+            reason_text = reason[question_index] if question_index < len(reason) else ""
+            w(f"{question_id} Answer: {answer or '(無回答)'}\n")
+            if reason_text:
+                w(f"{question_id} 選択理由（AI分析用）: {reason_text}\n")
+    
+    def _write_pm01_raw_reference(self, w: Callable[[str], int], pm01_raw_result: Dict[str, Any]) -> None:
+        """Writes a PM01 Raw Scoring result (used as the PM05 reference) to a prompt buffer."""
+        get = pm01_raw_result.get
+        aes_clarity = get('aes_clarity', 0)
+        aes_logic = get('aes_logic', 0)
+        aes_relevance = get('aes_relevance', 0)
+        aes_total = aes_clarity + aes_logic + aes_relevance
+        aes_score = round(aes_total / 3, 1) if aes_total > 0 else 0
+        w(
+            f"Primary Score: {get('primary_score', 0)}\n"
+            f"Sub Score: {get('sub_score', 0)}\n"
+            f"Process Score: {get('process_score', 0)}\n"
+            f"AES Clarity: {aes_clarity}\n"
+            f"AES Logic: {aes_logic}\n"
+            f"AES Relevance: {aes_relevance}\n"
+            f"AES Score (Average): {aes_score}\n"
+            f"Evidence: {get('evidence', '')}\n"
+            f"Judgment Reason: {get('judgment_reason', '')}\n"
+        )
     
     def _build_pm01_final_prompt(
         self,
@@ -265,37 +799,32 @@ class LLMService:
         aggregated_scores: Dict[str, Any]
     ) -> str:
         """Build PM01 Final analysis prompt using PM05 Raw validated scores."""
-        lines = []
-        
-        lines.append("# Respondent Information")
-        lines.append(f"ID: {respondent['id']}")
-        lines.append(f"Name: {respondent['name']}")
-        lines.append("")
-        
-        lines.append("# Aggregated Scores (from PM05 Raw validated scores)")
-        lines.append(f"Primary Scores: {aggregated_scores.get('scores_primary', {})}")
-        lines.append(f"Sub Scores: {aggregated_scores.get('scores_sub', {})}")
-        lines.append(f"Process Scores: {aggregated_scores.get('process', {})}")
-        lines.append(f"Total Score: {aggregated_scores.get('total_score', 0)}")
-        lines.append("")
-        
         # Get prompt from config sheet (required for STEP 3)
         prompt_text = self.config.get('promptPM1Final', '').strip()
         if not prompt_text:
             raise ValueError("promptPM1Final not configured in Config sheet. Required for STEP 3 (PM01 Final).")
         
-        lines.append("# Analysis Instructions")
-        lines.append(prompt_text)
-        lines.append("")
+        buf = io.StringIO()
+        w = buf.write
         
-        lines.append("# Required JSON Schema")
-        lines.append("""{
-  "overall_summary": "<comprehensive summary of the diagnosis>",
-  "ai_use_level": "<基礎|標準|高度>",
-  "recommendations": ["<recommendation1>", "<recommendation2>", ...]
-}""")
+        # Static content first (identical across respondents) so the API can reuse the cached prefix
+        w(self._static_prefix("# Analysis Instructions\n", prompt_text, _PM01_FINAL_SCHEMA_BLOCK))
+        
+        # Respondent-specific content as a single template
+        get = aggregated_scores.get
+        w(
+            "# Respondent Information\n"
+            f"ID: {respondent['id']}\n"
+            f"Name: {respondent['name']}\n"
+            "\n"
+            "# Aggregated Scores (from PM05 Raw validated scores)\n"
+            f"Primary Scores: {_fmt_scores(get('scores_primary', {}))}\n"
+            f"Sub Scores: {_fmt_scores(get('scores_sub', {}))}\n"
+            f"Process Scores: {_fmt_scores(get('process', {}))}\n"
+            f"Total Score: {get('total_score', 0)}"
+        )
         
-        return "\n".join(lines)
+        return buf.getvalue()
     
     def _build_pm05_final_prompt(
         self,
@@ -303,111 +832,158 @@ class LLMService:
         pm01_final: Dict[str, Any]
     ) -> str:
         """Build PM05 Final consistency check prompt."""
-        lines = []
-        
-        lines.append("# Respondent Information")
-        lines.append(f"ID: {respondent['id']}")
-        lines.append(f"Name: {respondent['name']}")
-        lines.append("")
-        
-        lines.append("# PM01 Final Result")
-        lines.append(f"Total Score: {pm01_final.get('total_score', 0)}")
-        lines.append(f"Primary Scores (Aggregated): {pm01_final.get('scores_primary', {})}")
-        lines.append(f"Sub Scores (Aggregated): {pm01_final.get('scores_sub', {})}")
-        lines.append(f"Process Scores (Aggregated): {pm01_final.get('process', {})}")
-        lines.append(f"AES Scores (Per Question): {pm01_final.get('aes', {})}")
-        lines.append(f"Overall Summary: {pm01_final.get('overall_summary', '')}")
-        lines.append(f"AI Use Level: {pm01_final.get('ai_use_level', '')}")
-        lines.append(f"Recommendations: {pm01_final.get('recommendations', [])}")
-        lines.append("")
-        
-        # Include per-question scores for validation
-        per_question = pm01_final.get('per_question', {})
-        if per_question:
-            lines.append("# Per-Question Scores (Q1-Q6)")
-            for q_id in ['Q1', 'Q2', 'Q3', 'Q4', 'Q5', 'Q6']:
-                q_data = per_question.get(q_id, {})
-                if q_data:
-                    lines.append(f"{q_id}: Primary={q_data.get('primary_score', 0)}, "
-                               f"Sub={q_data.get('sub_score', 0)}, "
-                               f"Process={q_data.get('process_score', 0)}, "
-                               f"AES={q_data.get('aes_score', 0)}, "
-                               f"AES_Clarity={q_data.get('aes_clarity', 0)}, "
-                               f"AES_Logic={q_data.get('aes_logic', 0)}, "
-                               f"AES_Relevance={q_data.get('aes_relevance', 0)}")
-            lines.append("")
-        
         # Get prompt from config sheet (can use promptPM5Raw or separate promptPM5Final)
         prompt_text = self.config.get('promptPM5Final', '').strip()
         if not prompt_text:
             # Fallback to promptPM5Raw if promptPM5Final not set
             prompt_text = self.config.get('promptPM5Raw', '').strip()
-        
-        if prompt_text:
-            lines.append("# Consistency Check Instructions")
-            lines.append(prompt_text)
-            lines.append("")
-        else:
+        if not prompt_text:
             raise ValueError("promptPM5Raw or promptPM5Final not configured in Config sheet. Required for STEP 4 (PM05 Final).")
         
-        lines.append("# Required JSON Schema")
-        lines.append("""{
-  "consistency_score": <0.0-1.0 float with 2 decimal places, required - calculated as 1 - (score_std / 2.5), where score_std is standard deviation of PRIMARY/SUB/PROCESS scores across Q1-Q6>,
-  "status": "<妥当|注意|再評価>",
-  "detected_issues": ["<issue1 in Japanese>", "<issue2 in Japanese>", ...],
-  "comment": "<string in Japanese, 80-120 characters - consistency evaluation, score trends, re-diagnosis recommendation if needed, required>"
-}""")
+        buf = io.StringIO()
+        w = buf.write
+        
+        # Static content first (identical across respondents) so the API can reuse the cached prefix
+        w(self._static_prefix("# Consistency Check Instructions\n", prompt_text, _PM05_FINAL_SCHEMA_BLOCK))
+        
+        # Respondent-specific content as a single template
+        get = pm01_final.get
+        w(
+            "# Respondent Information\n"
+            f"ID: {respondent['id']}\n"
+            f"Name: {respondent['name']}\n"
+            "\n"
+            "# PM01 Final Result\n"
+            f"Total Score: {get('total_score', 0)}\n"
+            f"Primary Scores (Aggregated): {_fmt_scores(get('scores_primary', {}))}\n"
+            f"Sub Scores (Aggregated): {_fmt_scores(get('scores_sub', {}))}\n"
+            f"Process Scores (Aggregated): {_fmt_scores(get('process', {}))}\n"
+            f"AES Scores (Per Question): {_fmt_scores(get('aes', {}))}\n"
+            f"Overall Summary: {get('overall_summary', '')}\n"
+            f"AI Use Level: {get('ai_use_level', '')}\n"
+            f"Recommendations: {' / '.join(map(str, get('recommendations', [])))}"
+        )
         
-        return "\n".join(lines)
+        # Include per-question scores for validation
+        per_question = get('per_question', {})
+        if per_question:
+            # One compact table row per question (column names written once) to keep this section's token count low
+            w("\n\n# Per-Question Scores (Q1-Q6)\n")
+            w(_PER_QUESTION_HEADER)
+            w("".join(
+                f"\n{q_id} | {q_data.get('primary_score', 0)} | {q_data.get('sub_score', 0)} | "
+                f"{q_data.get('process_score', 0)} | {q_data.get('aes_score', 0)} | {q_data.get('aes_clarity', 0)} | "
+                f"{q_data.get('aes_logic', 0)} | {q_data.get('aes_relevance', 0)}"
+                for q_id in ('Q1', 'Q2', 'Q3', 'Q4', 'Q5', 'Q6')
+                if (q_data := per_question.get(q_id))
+            ))
+        
+        return buf.getvalue()
     
-    def _invoke_llm(self, prompt: str, attempt: int, system_message: str) -> Optional[str]:
-        """Sends the prepared prompt to the configured LLM provider."""
-        api_key = self.config.get('llmApiKey')
-        if not api_key:
-            raise ValueError("API key not configured. Add llmApiKey to the Config sheet in your Google Spreadsheet.")
+    def _invoke_and_parse(
+        self,
+        prompt: str,
+        attempt: int,
+        system_message: str,
+        parse: Callable[[str], Optional[Dict[str, Any]]],
+        cache_text: Optional[str] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+        model: Optional[str] = None,
+        examples: Optional[List[Dict[str, str]]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Invokes the LLM (or reuses a cached response) and parses the result.
         
-        provider = self.config.get('llmProvider')
-        if not provider:
-            raise ValueError("llmProvider not configured in Config sheet.")
+        cache_text replaces the prompt in the cache key (e.g. respondent-independent text for the shared answer cache).
+        response_format is the step's strict JSON Schema, sent when llmStructuredOutputs is on.
+        model overrides llmModel; examples are few-shot turns sent before the prompt.
+        """
+        model = model or self.model
+        cache = self.response_cache
+        cache_key = None
+        if cache:
+            cache_key = cache.make_key(model, system_message, cache_text if cache_text is not None else prompt)
+            cached = cache.get(cache_key)
+            if cached:
+                parsed = parse(cached)
+                if parsed:
+                    return parsed
         
+        response = self._invoke_llm(prompt, attempt, system_message, response_format, model=model, examples=examples)
+        if not response:
+            return None
+        
+        parsed = parse(response)
+        if not parsed:
+            # One short re-ask in the same conversation instead of a full retry from scratch
+            print("  Invalid JSON response, asking the model to correct it...")
+            response = self._invoke_llm(
+                prompt,
+                attempt,
+                system_message,
+                response_format,
+                [{'role': 'assistant', 'content': response}, {'role': 'user', 'content': _JSON_REASK_MESSAGE}],
+                model=model,
+                examples=examples
+            )
+            parsed = parse(response) if response else None
+        
+        # Only responses that passed validation are cached, so retries never replay a bad answer
+        if parsed and cache:
+            cache.set(cache_key, response)
+        return parsed
+    
+    def _shared_answer_cache_text(self, prompt: str, respondent: Dict[str, Any]) -> str:
+        """
+        Cache text for the opt-in shared answer cache: the prompt without the respondent's ID/name,
+        Unicode (NFKC), case and whitespace normalized, so identical answers from different respondents share a response.
+        """
+        text = prompt.replace(f"\nID: {respondent['id']}\nName: {respondent['name']}\n", "\n", 1)
+        return " ".join(unicodedata.normalize('NFKC', text).casefold().split())
+    
+    def _invoke_llm(
+        self,
+        prompt: str,
+        attempt: int,
+        system_message: str,
+        response_format: Optional[Dict[str, Any]] = None,
+        followup: Optional[List[Dict[str, str]]] = None,
+        model: Optional[str] = None,
+        examples: Optional[List[Dict[str, str]]] = None
+    ) -> Optional[str]:
+        """Sends the prepared prompt (plus any example/follow-up turns) to the configured LLM provider."""
         try:
-            if provider == 'chatgpt':
-                return self._invoke_chatgpt(prompt, system_message)
+            if self.provider == 'chatgpt':
+                return self._invoke_chatgpt(prompt, system_message, response_format, followup, model, examples)
             else:
-                raise ValueError(f"Unsupported provider: {provider}")
+                raise ValueError(f"Unsupported provider: {self.provider}")
         except Exception as e:
             print(f"  LLM API error: {e}")
             return None
     
-    def _invoke_chatgpt(self, prompt: str, system_message: str) -> Optional[str]:
+    def _invoke_chatgpt(
+        self,
+        prompt: str,
+        system_message: str,
+        response_format: Optional[Dict[str, Any]] = None,
+        followup: Optional[List[Dict[str, str]]] = None,
+        model: Optional[str] = None,
+        examples: Optional[List[Dict[str, str]]] = None
+    ) -> Optional[str]:
         """Invokes the ChatGPT API."""
-        url = self.config.get('llmApiUrl')
-        if not url:
-            raise ValueError("llmApiUrl not configured in Config sheet.")
-        api_key = self.config['llmApiKey']
-        model = self.config.get('llmModel')
-        if not model:
-            raise ValueError("llmModel not configured in Config sheet.")
+        body = self._build_chat_body(model or self.model, prompt, system_message, response_format, followup, examples)
         
-        headers = {
-            'Authorization': f'Bearer {api_key}',
-            'Content-Type': 'application/json'
-        }
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
         
-        body = {
-            'model': model,
-            'messages': [
-                {'role': 'system', 'content': system_message},
-                {'role': 'user', 'content': prompt}
-            ],
-            'temperature': 0,
-            'response_format': {'type': 'json_object'}  # Force JSON output
-        }
+        if self.stream:
+            return self._invoke_chatgpt_stream(body)
         
-        response = requests.post(url, headers=headers, json=body, timeout=300)
+        with self.request_slots:
+            response = self._post_chat(body)
         response.raise_for_status()
         
-        data = response.json()
+        data = json_loads(response.content)
         if not data.get('choices') or len(data['choices']) == 0:
             raise ValueError("No choices in LLM API response")
         
@@ -416,3 +992,277 @@ class LLMService:
             raise ValueError("No content in LLM API response")
         
         return content.strip()
+    
+    def _post_chat(self, body: Dict[str, Any], stream: bool = False) -> requests.Response:
+        """POSTs a pre-serialized chat body; gzip-compressed when enabled, falling back to plain JSON on HTTP 415."""
+        data = json_dumps_bytes(body)
+        if self.gzip_requests:
+            response = self.session.post(
+                self.api_url,
+                headers=self.gzip_headers,
+                data=gzip.compress(data, compresslevel=6),
+                timeout=300,
+                stream=stream
+            )
+            if response.status_code != 415:
+                return response
+            response.close()
+            print("  LLM endpoint does not accept gzip request bodies; sending them uncompressed")
+            self.gzip_requests = False
+        
+        return self.session.post(self.api_url, headers=self.headers, data=data, timeout=300, stream=stream)
+    
+    def _invoke_chatgpt_stream(self, body: Dict[str, Any]) -> Optional[str]:
+        """Invokes the ChatGPT API with SSE streaming and stops reading once the JSON object is complete."""
+        body['stream'] = True
+        parts = []
+        scanner = _JsonObjectScanner()
+        
+        with self.request_slots:
+            with self._post_chat(body, stream=True) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if not line.startswith(b'data: '):
+                        continue
+                    payload = line[6:]
+                    if payload == b'[DONE]':
+                        break
+                    choices = json_loads(payload).get('choices')
+                    delta = choices[0].get('delta', {}).get('content') if choices else None
+                    if not delta:
+                        continue
+                    end = scanner.feed(delta)
+                    if end >= 0:
+                        # Closing the response early cancels the rest of the generation
+                        parts.append(delta[:end])
+                        break
+                    parts.append(delta)
+        
+        content = "".join(parts)
+        if not content:
+            raise ValueError("No content in LLM API response")
+        
+        return content.strip()
+    
+    def _build_chat_body(
+        self,
+        model: str,
+        prompt: str,
+        system_message: str,
+        response_format: Optional[Dict[str, Any]] = None,
+        followup: Optional[List[Dict[str, str]]] = None,
+        examples: Optional[List[Dict[str, str]]] = None
+    ) -> Dict[str, Any]:
+        """Builds the Chat Completions request body (examples go before the prompt, followup turns after it)."""
+        messages = [{'role': 'system', 'content': system_message}]
+        if examples:
+            messages.extend(examples)
+        messages.append({'role': 'user', 'content': prompt})
+        if followup:
+            messages.extend(followup)
+        return {
+            'model': model,
+            'messages': messages,
+            'temperature': self.TEMPERATURE,
+            # Force JSON output (exactly the step's schema when structured outputs are enabled)
+            'response_format': response_format if self.structured_outputs and response_format else {'type': 'json_object'}
+        }
+    
+    def run_pm01_raw_scoring_batch_api(
+        self,
+        respondents: List[Dict[str, Any]],
+        questions: List[Dict[str, Any]]
+    ) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        STEP 1 via the OpenAI Batch API: PM01 Raw Scoring of Q1-Q6 for many respondents in one batch.
+        
+        For offline runs: half the token cost and no per-minute request limit, but results can take up to 24h.
+        
+        Returns dict mapping respondent ID to its Q1-Q6 results; respondents with any invalid answer are left out.
+        """
+        indexed_questions = self._select_scored_questions(questions)
+        requests_by_id = {}
+        for respondent in respondents:
+            for question_index, question in indexed_questions:
+                custom_id = f"{respondent['id']}-Q{question['number']}"
+                prompt = self._build_pm01_raw_prompt(respondent, question, question_index)
+                requests_by_id[custom_id] = (_PM01_RAW_SYSTEM_MESSAGE, prompt)
+        
+        return self._run_raw_batch_api(
+            respondents,
+            indexed_questions,
+            requests_by_id,
+            self.json_parser.parse_pm01_raw_response,
+            _PM01_RAW_RESPONSE_FORMAT
+        )
+    
+    def run_pm05_raw_scoring_batch_api(
+        self,
+        respondents: List[Dict[str, Any]],
+        questions: List[Dict[str, Any]],
+        pm01_raw_results: Dict[str, Dict[str, Dict[str, Any]]]
+    ) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        STEP 2 via the Batch API: PM05 Raw Scoring of Q1-Q6 for many respondents in one batch.
+        
+        pm01_raw_results maps respondent ID to its PM01 Raw results; respondents without them are skipped.
+        """
+        indexed_questions = self._select_scored_questions(questions)
+        requests_by_id = {}
+        scored_respondents = []
+        for respondent in respondents:
+            respondent_pm01 = pm01_raw_results.get(respondent['id'])
+            if not respondent_pm01:
+                continue
+            scored_respondents.append(respondent)
+            for question_index, question in indexed_questions:
+                question_id = f"Q{question['number']}"
+                custom_id = f"{respondent['id']}-{question_id}"
+                prompt = self._build_pm05_raw_prompt(respondent, question, question_index, respondent_pm01.get(question_id, {}))
+                requests_by_id[custom_id] = (_PM05_RAW_SYSTEM_MESSAGE, prompt)
+        
+        return self._run_raw_batch_api(
+            scored_respondents,
+            indexed_questions,
+            requests_by_id,
+            self.json_parser.parse_pm05_raw_response,
+            _PM05_RAW_RESPONSE_FORMAT
+        )
+    
+    def _run_raw_batch_api(
+        self,
+        respondents: List[Dict[str, Any]],
+        indexed_questions: List[Tuple[int, Dict[str, Any]]],
+        requests_by_id: Dict[str, Tuple[str, str]],
+        parse: Callable[[str, int], Optional[Dict[str, Any]]],
+        response_format: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Submits per-question requests as one batch, waits for it and groups valid results by respondent."""
+        if not requests_by_id:
+            return {}
+        
+        batch_id = self.submit_batch([
+            (custom_id, system_message, prompt)
+            for custom_id, (system_message, prompt) in requests_by_id.items()
+        ], response_format)
+        print(f"  Submitted batch {batch_id} ({len(requests_by_id)} requests)")
+        self.poll_batch(batch_id)
+        contents = self.collect_batch(batch_id)
+        
+        results = {}
+        for respondent in respondents:
+            respondent_results = {}
+            for _, question in indexed_questions:
+                question_id = f"Q{question['number']}"
+                content = contents.get(f"{respondent['id']}-{question_id}")
+                parsed = parse(content, question['number']) if content else None
+                if not parsed:
+                    print(f"  ✗ {respondent['id']} {question_id}: no valid batch result")
+                    break
+                respondent_results[question_id] = parsed
+            else:
+                results[respondent['id']] = respondent_results
+        
+        return results
+    
+    def submit_batch(
+        self,
+        batch_requests: List[Tuple[str, str, str]],
+        response_format: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Uploads (custom_id, system_message, prompt) requests as a JSONL file and creates a batch. Returns the batch ID."""
+        api_base, endpoint = self._batch_api_base()
+        
+        jsonl = b"\n".join(
+            json_dumps_bytes({
+                'custom_id': custom_id,
+                'method': 'POST',
+                'url': endpoint,
+                'body': self._build_chat_body(self.model, prompt, system_message, response_format)
+            })
+            for custom_id, system_message, prompt in batch_requests
+        )
+        
+        response = self.session.post(
+            f"{api_base}/files",
+            data={'purpose': 'batch'},
+            files={'file': ('batch_input.jsonl', jsonl, 'application/jsonl')},
+            timeout=300
+        )
+        response.raise_for_status()
+        input_file_id = json_loads(response.content)['id']
+        
+        response = self.session.post(
+            f"{api_base}/batches",
+            headers=self.headers,
+            data=json_dumps_bytes({
+                'input_file_id': input_file_id,
+                'endpoint': endpoint,
+                'completion_window': '24h'
+            }),
+            timeout=60
+        )
+        response.raise_for_status()
+        return json_loads(response.content)['id']
+    
+    def poll_batch(
+        self,
+        batch_id: str,
+        poll_interval: int = 10,
+        max_poll_interval: int = 300,
+        timeout: int = 86400
+    ) -> Dict[str, Any]:
+        """
+        Waits until the batch reaches a final state and returns the batch object.
+        
+        The poll interval doubles after every check (up to max_poll_interval): small batches finish within
+        minutes, while a 24h batch would otherwise cost thousands of status requests.
+        """
+        api_base, _ = self._batch_api_base()
+        deadline = time.monotonic() + timeout
+        
+        while True:
+            response = self.session.get(f"{api_base}/batches/{batch_id}", timeout=60)
+            response.raise_for_status()
+            batch = json_loads(response.content)
+            status = batch.get('status')
+            if status in ('completed', 'failed', 'expired', 'cancelled'):
+                print(f"  Batch {batch_id} finished with status: {status}")
+                return batch
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Batch {batch_id} did not finish within {timeout} seconds (status: {status})")
+            time.sleep(min(poll_interval, max(0.0, deadline - time.monotonic())))
+            poll_interval = min(poll_interval * 2, max_poll_interval)
+    
+    def collect_batch(self, batch_id: str) -> Dict[str, str]:
+        """Downloads the batch output and returns response content keyed by custom_id (successful requests only)."""
+        api_base, _ = self._batch_api_base()
+        response = self.session.get(f"{api_base}/batches/{batch_id}", timeout=60)
+        response.raise_for_status()
+        output_file_id = json_loads(response.content).get('output_file_id')
+        if not output_file_id:
+            return {}
+        
+        response = self.session.get(f"{api_base}/files/{output_file_id}/content", timeout=300)
+        response.raise_for_status()
+        
+        contents = {}
+        for line in response.content.splitlines():
+            if not line.strip():
+                continue
+            item = json_loads(line)
+            body = (item.get('response') or {}).get('body') or {}
+            choices = body.get('choices') or []
+            content = choices[0].get('message', {}).get('content') if choices else None
+            if content:
+                contents[item.get('custom_id')] = content.strip()
+        
+        return contents
+    
+    def _batch_api_base(self) -> Tuple[str, str]:
+        """Derives the API base URL and the batch endpoint path from llmApiUrl."""
+        parts = urlsplit(self.api_url)
+        # e.g. https://api.openai.com/v1/chat/completions -> https://api.openai.com/v1, /v1/chat/completions
+        api_base = f"{parts.scheme}://{parts.netloc}{parts.path.rsplit('/chat/completions', 1)[0]}"
+        return api_base, parts.path
+
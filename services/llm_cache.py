@@ -0,0 +1,74 @@
+"""
+LLM response cache - persistent exact-match cache for deterministic (temperature 0) LLM calls.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+
+class LLMResponseCache:
+    """SQLite-backed cache of LLM response content keyed by (model, system message, prompt)."""
+    
+    def __init__(self, path: str, ttl_seconds: int = 86400):
+        """Open (or create) the cache database at path."""
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Shared across the per-question worker threads; access is serialized by the lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # WAL lets concurrent runs (e.g. CLI and web app) read while another process writes
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, content TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+    
+    @staticmethod
+    def make_key(model: str, system_message: str, prompt: str) -> str:
+        """Build the cache key for a request."""
+        return hashlib.blake2b(
+            f"{model}\x00{system_message}\x00{prompt}".encode('utf-8'),
+            digest_size=16
+        ).hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return cached content for key, or None when missing or expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if not row:
+                self.misses += 1
+                return None
+            if row[1] < time.time():
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+    
+    def set(self, key: str, content: str) -> None:
+        """Store content for key."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, content, expires_at) VALUES (?, ?, ?)",
+                (key, content, time.time() + self.ttl_seconds)
+            )
+            self._conn.commit()
+    
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters since the cache was opened."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+    
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
@@ -2,16 +2,145 @@
 Report generation service for individual and organization reports.
 """
 
+import io
 import os
 import json
+import contextlib
+import functools
 import statistics
-import hashlib
 import secrets
-from datetime import datetime
+import threading
+import time
+from datetime import date, datetime
 from typing import Dict, Any, Optional, List
 from pathlib import Path
 from collections import defaultdict
-from string import Template
+from concurrent.futures import ThreadPoolExecutor
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template, TemplateNotFound
+from jinja2.environment import TemplateStream
+from core.utils import json_dumps, json_loads
+
+
+@functools.lru_cache(maxsize=4)
+def _jinja_environment(template_dir: str) -> Environment:
+    """
+    Jinja2 environment per template directory, shared by all ReportService instances.
+    
+    Templates are compiled to Python code once per process (bytecode is also cached on disk across restarts)
+    and never re-checked on disk, so template edits take effect after a restart. Values are pre-built
+    HTML/JSON, so autoescape stays off.
+    """
+    return Environment(
+        loader=FileSystemLoader(template_dir, encoding='utf-8'),
+        bytecode_cache=FileSystemBytecodeCache(),
+        autoescape=False,
+        auto_reload=False,
+        keep_trailing_newline=True
+    )
+
+
+# Carousel slide markup shared by both reports; (data key, slide title, extra section class) per slide
+_SLIDE_TPL = '<div class="analysis-slide"><div class="analysis-section{extra_cls}"><div class="analysis-title">{title}</div><div class="analysis-content">{content}</div></div></div>'
+_INDIVIDUAL_SLIDES = (
+    ('thinking_patterns', 'あなたの考え方のクセ・傾向', ''),
+    ('why_get_stuck', 'なぜ詰まるのか', ''),
+    ('actionable_hints', '明日から何を変えればいいか', ' hints-section')
+)
+_ORGANIZATION_SLIDES = (
+    ('structural_analysis', '判断が揃わない原因（構造的理由）', ''),
+    ('variance_analysis', 'スコアのばらつきと揃っていないポイント', ''),
+    ('ai_instability_explanation', 'AI活用が不安定な理由', ''),
+    ('actionable_recommendations', '次に何をすればいいか（選択肢）', ' recommendations-section')
+)
+
+
+def _analysis_slides(data: Dict[str, Any], slide_specs: tuple) -> List[str]:
+    """Carousel slides for the non-empty analysis sections, in display order."""
+    return [
+        _SLIDE_TPL.format(extra_cls=extra_cls, title=title, content=data[key])
+        for key, title, extra_cls in slide_specs
+        if data[key]
+    ]
+
+
+def _quartiles(ordered: List[float]) -> tuple:
+    """
+    Quartile cut points (q1, median, q3) of an already sorted list (at least 2 values).
+    
+    Same arithmetic as statistics.quantiles(n=4) with the default 'exclusive' method, read straight
+    from the sorted list instead of copying and re-sorting it.
+    """
+    count = len(ordered)
+    m = count + 1
+    cuts = []
+    for i in (1, 2, 3):
+        j = i * m // 4
+        j = 1 if j < 1 else count - 1 if j > count - 1 else j
+        delta = i * m - j * 4
+        cuts.append((ordered[j - 1] * (4 - delta) + ordered[j] * delta) / 4)
+    return tuple(cuts)
+
+
+@functools.lru_cache(maxsize=8)
+def _format_report_date(day: date) -> str:
+    """Report date label (e.g. 2025年01月31日), formatted once per day across a bulk run."""
+    return day.strftime('%Y年%m月%d日')
+
+
+def _score_summary(scores: List[float]) -> Dict[str, float]:
+    """
+    Distribution stats for one category's scores, computed in a single pass.
+    
+    The scores are sorted once: q1/median/q3 (the middle quartile equals statistics.median) and
+    min/max are all read from the same sorted list.
+    """
+    ordered = sorted(scores)
+    if len(ordered) > 1:
+        q1, median, q3 = _quartiles(ordered)
+        std = statistics.stdev(ordered)
+    else:
+        q1 = median = q3 = ordered[0]
+        std = 0
+    return {
+        'min': ordered[0],
+        'q1': q1,
+        'median': median,
+        'q3': q3,
+        'max': ordered[-1],
+        'mean': statistics.mean(scores),
+        'std': std
+    }
+
+
+class _OrgRecord:
+    """One respondent's PM1Final row as read for an organization report."""
+    
+    __slots__ = (
+        'respondent_id', 'name', 'department', 'total_score',
+        'scores_primary', 'scores_sub', 'process', 'aes', 'ai_use_level'
+    )
+    
+    def __init__(
+        self,
+        respondent_id: str,
+        name: str,
+        department: str,
+        total_score: float,
+        scores_primary: Dict[str, Any],
+        scores_sub: Dict[str, Any],
+        process: Dict[str, Any],
+        aes: Dict[str, Any],
+        ai_use_level: str
+    ):
+        self.respondent_id = respondent_id
+        self.name = name
+        self.department = department
+        self.total_score = total_score
+        self.scores_primary = scores_primary
+        self.scores_sub = scores_sub
+        self.process = process
+        self.aes = aes
+        self.ai_use_level = ai_use_level
 
 
 class ReportService:
@@ -29,6 +158,18 @@ class ReportService:
         'prompt clarity': 'プロンプト明瞭性',
         'consistency': '一貫性'
     }
+    # (English key, Japanese label) pairs in display order, for iterating without per-key lookups
+    PROCESS_PAIRS = tuple(PROCESS_LABELS_JP.items())
+    
+    # Former names of renamed PRIMARY categories (still present in older PM1Final rows)
+    PRIMARY_OLD_NAMES = {
+        '論理思考': '論理構成',
+        'AI検証/優先順位判断': 'AI検証'
+    }
+    
+    # Seconds the respondents-sheet lookups and the PM1Final rows are reused across organization reports
+    RESPONDENT_CACHE_TTL = 300
+    PM1FINAL_CACHE_TTL = 60
     
     def __init__(self, output_dir: str = "report", template_dir: str = "templates", sheets_service=None):
         """Initialize report service with output directory and template directory."""
@@ -36,26 +177,79 @@ class ReportService:
         self.output_dir.mkdir(exist_ok=True)
         self.template_dir = Path(template_dir)
         self.sheets_service = sheets_service
+        # ((sheets service, respondents sheet name), respondent_map, department_map) from the last organization report
+        self._respondent_lookup = None
+        self._respondent_lookup_time = 0.0
+        # PM1Final rows grouped by stripped Company_Name, from the last organization report, and the
+        # (sheets service, its PM1Final write count) they were read at
+        self._pm1final_rows = None
+        self._pm1final_rows_time = 0.0
+        self._pm1final_rows_key = None
+        # Serializes refreshing the two caches above when organization reports run concurrently
+        self._org_sources_lock = threading.Lock()
+        # Mappings held inside batch() (None outside a batch)
+        self._url_batch = None
+        # HTML file writes run here inside batch() (None outside a batch)
+        self._file_writer = None
     
-    def _generate_hash_id(self, respondent_id: str, timestamp: str = None) -> str:
-        """Generate a unique hash ID for the report URL."""
-        if timestamp is None:
-            timestamp = datetime.now().isoformat()
-        
-        # Create a hash from respondent ID + timestamp + random salt
-        salt = secrets.token_hex(8)
-        hash_input = f"{respondent_id}_{timestamp}_{salt}".encode('utf-8')
-        hash_id = hashlib.sha256(hash_input).hexdigest()[:16]  # Use first 16 chars for shorter URL
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Generate several reports as one batch.
         
-        return hash_id
+        Inside the block HTML files are written on a background thread (overlapping the next report's LLM call)
+        and report URL mappings are held; on exit the file writes are awaited and the mappings written in one append.
+        Outside a batch the file and the URL mapping are written before the URL is returned, since the web app
+        serves them right away.
+        """
+        self._url_batch = []
+        self._file_writer = ThreadPoolExecutor(max_workers=1)
+        try:
+            yield self
+        finally:
+            file_writer, self._file_writer = self._file_writer, None
+            file_writer.shutdown(wait=True)
+            held, self._url_batch = self._url_batch, None
+            if held:
+                try:
+                    self.sheets_service.write_report_urls(held)
+                except Exception as e:
+                    print(f"Warning: Could not store report URL mapping: {e}")
+    
+    def _write_report_file(self, filepath: Path, html_stream: TemplateStream) -> None:
+        """Render a report into its file (on the batch's writer thread inside batch(), otherwise right away)."""
+        # Rendered chunks are encoded and written as they are produced, so the full document is never held as one
+        # string; buffering groups small template chunks into fewer writes
+        html_stream.enable_buffering(size=64)
+        if self._file_writer is not None:
+            def report_write_failure(future):
+                if future.exception():
+                    print(f"Warning: Could not write report file {filepath}: {future.exception()}")
+            
+            self._file_writer.submit(html_stream.dump, str(filepath), 'utf-8').add_done_callback(report_write_failure)
+        else:
+            html_stream.dump(str(filepath), 'utf-8')
     
-    def _load_template(self, template_name: str) -> str:
-        """Load HTML template from file."""
-        template_path = self.template_dir / template_name
-        if not template_path.exists():
-            raise FileNotFoundError(f"Template not found: {template_path}")
-        with open(template_path, 'r', encoding='utf-8') as f:
-            return f.read()
+    def _store_report_url(self, entry: Dict[str, Any]) -> None:
+        """Store a report URL mapping in Google Sheets (held for one append at the end of a batch())."""
+        if self._url_batch is not None:
+            self._url_batch.append(entry)
+            return
+        try:
+            self.sheets_service.write_report_urls([entry])
+        except Exception as e:
+            print(f"Warning: Could not store report URL mapping: {e}")
+    
+    def _generate_hash_id(self) -> str:
+        """Generate a unique, unguessable hash ID for the report URL (16 hex characters from 8 random bytes)."""
+        return secrets.token_hex(8)
+    
+    def _load_template(self, template_name: str) -> Template:
+        """Load the compiled HTML template (cached across reports and ReportService instances)."""
+        try:
+            return _jinja_environment(str(self.template_dir)).get_template(template_name)
+        except TemplateNotFound:
+            raise FileNotFoundError(f"Template not found: {self.template_dir / template_name}") from None
     
     def generate_individual_report(
         self,
@@ -63,7 +257,8 @@ class ReportService:
         pm01_final: Dict[str, Any],
         pm05_final: Optional[Dict[str, Any]] = None,
         llm_service: Any = None,
-        config: Any = None
+        config: Any = None,
+        skip_llm: bool = False
     ) -> Dict[str, str]:
         """
         Generate individual report HTML from PM01 Final and PM05 Final results.
@@ -74,41 +269,43 @@ class ReportService:
             pm05_final: PM05 Final results with consistency check (optional)
             llm_service: Optional LLM service for generating thinking pattern analysis
             config: Optional config object
+            skip_llm: Score-only report (no thinking pattern analysis), e.g. for bulk previews
         
         Returns:
             Dictionary with 'filepath' and 'url' keys
         """
+        # One clock read for the report date, the hash ID and the stored timestamp
+        now = datetime.now()
+        
         # Extract data for report
-        report_data = self._prepare_report_data(respondent, pm01_final, pm05_final, llm_service, config)
+        report_data = self._prepare_report_data(
+            respondent, pm01_final, pm05_final, llm_service, config, now=now, skip_llm=skip_llm
+        )
         
-        # Generate HTML
-        html_content = self._generate_html(report_data)
+        # Generate HTML (rendered while it is written to the file)
+        html_stream = self._generate_html(report_data)
         
         # Generate hash ID and URL
-        timestamp = datetime.now().isoformat()
-        hash_id = self._generate_hash_id(respondent['id'], timestamp)
+        timestamp = now.isoformat()
+        hash_id = self._generate_hash_id()
         report_url = f"{self.REPORT_BASE_URL}/{hash_id}.html"
         
         # Save to file (use hash_id as filename for easier lookup)
         filename = f"{hash_id}.html"
         filepath = self.output_dir / filename
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        self._write_report_file(filepath, html_stream)
         
         # Store URL mapping in Google Sheets if sheets_service is available
         if self.sheets_service:
-            try:
-                self.sheets_service.write_report_url(
-                    respondent_id=respondent['id'],
-                    hash_id=hash_id,
-                    filepath=str(filepath),
-                    report_url=report_url,
-                    timestamp=timestamp,
-                    report_type='individual'
-                )
-            except Exception as e:
-                print(f"Warning: Could not store report URL mapping: {e}")
+            self._store_report_url({
+                'respondent_id': respondent['id'],
+                'hash_id': hash_id,
+                'filepath': str(filepath),
+                'report_url': report_url,
+                'timestamp': timestamp,
+                'report_type': 'individual'
+            })
         
         return {
             'filepath': str(filepath),
@@ -122,9 +319,13 @@ class ReportService:
         pm01_final: Dict[str, Any],
         pm05_final: Optional[Dict[str, Any]],
         llm_service: Any = None,
-        config: Any = None
+        config: Any = None,
+        now: Optional[datetime] = None,
+        skip_llm: bool = False
     ) -> Dict[str, Any]:
         """Prepare data structure for report generation."""
+        if now is None:
+            now = datetime.now()
         # Get total_score and level from diagnosis results (no default calculation)
         total_score = pm01_final.get('total_score', 0)
         level = pm01_final.get('level', '') or (pm05_final.get('level', '') if pm05_final else '')
@@ -141,13 +342,7 @@ class ReportService:
         
         # Extract PROCESS scores (use Japanese labels)
         process_scores = pm01_final.get('process', {})
-        process_data = {
-            self.PROCESS_LABELS_JP['clarity']: process_scores.get('clarity', 0),
-            self.PROCESS_LABELS_JP['structure']: process_scores.get('structure', 0),
-            self.PROCESS_LABELS_JP['hypothesis']: process_scores.get('hypothesis', 0),
-            self.PROCESS_LABELS_JP['prompt clarity']: process_scores.get('prompt clarity', 0),
-            self.PROCESS_LABELS_JP['consistency']: process_scores.get('consistency', 0)
-        }
+        process_data = {jp_label: process_scores.get(cat, 0) for cat, jp_label in self.PROCESS_PAIRS}
         
         # Calculate PRIMARY average: average of all PRIMARY items displayed
         primary_values = [v for v in primary_data.values() if isinstance(v, (int, float))]
@@ -175,54 +370,53 @@ class ReportService:
         why_get_stuck = ''
         actionable_hints = ''
         
-        if llm_service and config:
+        if llm_service and config and not skip_llm:
             try:
-                # Get prompt from config sheet
+                # Get prompt from config sheet (checked before any of the prompt is built)
                 prompt_text = config.get('promptInd', '').strip()
                 if not prompt_text:
                     raise ValueError("promptInd not configured in Config sheet. Required for individual report generation.")
                 
                 # Build data section for individual thinking pattern analysis
-                prompt_lines = []
-                prompt_lines.append("# Individual Diagnosis Report Generation")
-                prompt_lines.append(f"Respondent: {respondent.get('name', 'N/A')}")
-                prompt_lines.append(f"Total Score: {round(total_score, 1)}")
-                prompt_lines.append("")
-                prompt_lines.append("## Score Details")
-                prompt_lines.append("### PRIMARY Skills:")
+                buf = io.StringIO()
+                w = buf.write
+                w(
+                    "# Individual Diagnosis Report Generation\n"
+                    f"Respondent: {respondent.get('name', 'N/A')}\n"
+                    f"Total Score: {round(total_score, 1)}\n"
+                    "\n"
+                    "## Score Details\n"
+                    "### PRIMARY Skills:\n"
+                )
                 for category, score in primary_data.items():
-                    prompt_lines.append(f"- {category}: {score}")
-                prompt_lines.append("")
-                prompt_lines.append("### PROCESS Evaluation:")
+                    w(f"- {category}: {score}\n")
+                w("\n### PROCESS Evaluation:\n")
                 for category, score in process_data.items():
-                    prompt_lines.append(f"- {category}: {score}")
-                prompt_lines.append("")
-                prompt_lines.append("### AES Evaluation:")
-                prompt_lines.append(f"- Clarity: {round(aes_clarity, 1)}")
-                prompt_lines.append(f"- Logic: {round(aes_logic, 1)}")
-                prompt_lines.append(f"- Relevance: {round(aes_relevance, 1)}")
-                prompt_lines.append("")
+                    w(f"- {category}: {score}\n")
+                w(
+                    "\n"
+                    "### AES Evaluation:\n"
+                    f"- Clarity: {round(aes_clarity, 1)}\n"
+                    f"- Logic: {round(aes_logic, 1)}\n"
+                    f"- Relevance: {round(aes_relevance, 1)}\n"
+                    "\n"
+                )
                 if overall_comment:
-                    prompt_lines.append("## Existing Overall Evaluation")
-                    prompt_lines.append(overall_comment)
-                    prompt_lines.append("")
-                prompt_lines.append("---")
-                prompt_lines.append("")
-                prompt_lines.append("## Analysis Instructions")
-                prompt_lines.append(prompt_text)
+                    w(f"## Existing Overall Evaluation\n{overall_comment}\n\n")
+                w(f"---\n\n## Analysis Instructions\n{prompt_text}")
                 
-                prompt = "\n".join(prompt_lines)
-                response = llm_service._invoke_llm(prompt, 1, "You are an expert thinking pattern analyst. Focus on practical insights, not scores. Output ONLY valid JSON with all text in Japanese.")
+                prompt = buf.getvalue()
+                parsed = llm_service.run_report_analysis(
+                    prompt,
+                    "You are an expert thinking pattern analyst. Focus on practical insights, not scores. Output ONLY valid JSON with all text in Japanese."
+                )
                 
-                if response:
-                    try:
-                        parsed = json.loads(response)
-                        thinking_patterns = parsed.get('thinking_patterns', '')
-                        why_get_stuck = parsed.get('why_get_stuck', '')
-                        actionable_hints = parsed.get('actionable_hints', '')
-                    except json.JSONDecodeError:
-                        print("Warning: Failed to parse LLM response for thinking pattern analysis")
-                        print(f"Response: {response[:500]}")
+                if parsed:
+                    thinking_patterns = parsed.get('thinking_patterns', '')
+                    why_get_stuck = parsed.get('why_get_stuck', '')
+                    actionable_hints = parsed.get('actionable_hints', '')
+                else:
+                    print("Warning: No valid JSON response for thinking pattern analysis")
             except Exception as e:
                 print(f"Warning: Failed to generate thinking pattern analysis: {e}")
                 import traceback
@@ -231,7 +425,7 @@ class ReportService:
         return {
             'respondent_id': respondent.get('id', ''),
             'respondent_name': respondent.get('name', ''),
-            'diagnosis_date': datetime.now().strftime('%Y年%m月%d日'),
+            'diagnosis_date': _format_report_date(now.date()),
             'total_score': round(total_score, 1),
             'level': level,
             'primary_data': primary_data,
@@ -249,33 +443,18 @@ class ReportService:
             'actionable_hints': actionable_hints
         }
     
-    def _json_escape(self, json_str: str) -> str:
-        """Escape JSON string for embedding in JavaScript."""
-        return json_str.replace('\\', '\\\\').replace('"', '\\"')
-    
-    def _generate_html(self, data: Dict[str, Any]) -> str:
-        """Generate HTML content for individual report."""
+    def _generate_html(self, data: Dict[str, Any]) -> TemplateStream:
+        """Generate HTML content for individual report (as a stream of rendered chunks)."""
         # Load template
         template = self._load_template("individual_report.html")
         
         # Prepare data for template (no HTML generation, only JSON data)
         respondent_name_html = f'<div class="name">{data["respondent_name"]}</div>' if data["respondent_name"] else ''
-        process_data_json = json.dumps(data["process_data"], ensure_ascii=False)
-        primary_data_json = json.dumps(data["primary_data"], ensure_ascii=False)
-        
-        # Format thinking pattern analysis sections
-        thinking_patterns = data.get('thinking_patterns', '')
-        why_get_stuck = data.get('why_get_stuck', '')
-        actionable_hints = data.get('actionable_hints', '')
-        
-        # Create individual slide items for carousel
-        slides = []
-        if thinking_patterns:
-            slides.append(f'<div class="analysis-slide"><div class="analysis-section"><div class="analysis-title">あなたの考え方のクセ・傾向</div><div class="analysis-content">{thinking_patterns}</div></div></div>')
-        if why_get_stuck:
-            slides.append(f'<div class="analysis-slide"><div class="analysis-section"><div class="analysis-title">なぜ詰まるのか</div><div class="analysis-content">{why_get_stuck}</div></div></div>')
-        if actionable_hints:
-            slides.append(f'<div class="analysis-slide"><div class="analysis-section hints-section"><div class="analysis-title">明日から何を変えればいいか</div><div class="analysis-content">{actionable_hints}</div></div></div>')
+        process_data_json = json_dumps(data["process_data"])
+        primary_data_json = json_dumps(data["primary_data"])
+        
+        # Create individual slide items for carousel (thinking pattern analysis sections)
+        slides = _analysis_slides(data, _INDIVIDUAL_SLIDES)
         
         # Wrap slides in carousel container (draggable, no buttons)
         if slides:
@@ -284,12 +463,11 @@ class ReportService:
             analysis_sections_html = ''
         
         # Use analysis sections if available, otherwise fall back to overall_comment
-        if not analysis_sections_html and data.get('overall_comment'):
+        if not analysis_sections_html and data['overall_comment']:
             analysis_sections_html = f'<div class="analysis-section"><div class="analysis-title">総合評価</div><div class="analysis-content">{data["overall_comment"]}</div></div>'
         
-        # Replace placeholders using Template.safe_substitute
-        template_obj = Template(template)
-        return template_obj.safe_substitute(
+        # Render the precompiled Jinja2 template
+        return template.stream(
             respondent_name_html=respondent_name_html,
             diagnosis_date=data["diagnosis_date"],
             total_score=data["total_score"],
@@ -301,7 +479,7 @@ class ReportService:
             aes_clarity=data["aes_clarity"],
             aes_logic=data["aes_logic"],
             aes_relevance=data["aes_relevance"],
-            overall_comment=data.get("overall_comment", ""),
+            overall_comment=data["overall_comment"],
             process_data_json=process_data_json,
             analysis_sections_html=analysis_sections_html
         )
@@ -331,39 +509,38 @@ class ReportService:
         if not org_data or org_data['count'] == 0:
             raise ValueError(f"No data found for company: {company_name}")
         
+        # One clock read for the report date, the hash ID and the stored timestamp
+        now = datetime.now()
+        
         # Prepare report data
-        report_data = self._prepare_organization_data(org_data, llm_service, config)
+        report_data = self._prepare_organization_data(org_data, llm_service, config, now=now)
         
         # Generate HTML
-        html_content = self._generate_organization_html(report_data)
+        html_stream = self._generate_organization_html(report_data)
         
         # Generate hash ID and URL
-        timestamp = datetime.now().isoformat()
-        hash_id = self._generate_hash_id(company_name, timestamp)
+        timestamp = now.isoformat()
+        hash_id = self._generate_hash_id()
         report_url = f"{self.REPORT_BASE_URL}/{hash_id}.html"
         
         # Save to file (use hash_id as filename for easier lookup)
         filename = f"{hash_id}.html"
         filepath = self.output_dir / filename
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        self._write_report_file(filepath, html_stream)
         
         # Store URL mapping in Google Sheets if sheets_service is available
         if self.sheets_service:
-            try:
-                self.sheets_service.write_report_url(
-                    respondent_id=company_name,
-                    hash_id=hash_id,
-                    filepath=str(filepath),
-                    report_url=report_url,
-                    timestamp=timestamp,
-                    report_type='organization',
-                    company_name=company_name,
-                    department=department_filter
-                )
-            except Exception as e:
-                print(f"Warning: Could not store report URL mapping: {e}")
+            self._store_report_url({
+                'respondent_id': company_name,
+                'hash_id': hash_id,
+                'filepath': str(filepath),
+                'report_url': report_url,
+                'timestamp': timestamp,
+                'report_type': 'organization',
+                'company_name': company_name,
+                'department': department_filter
+            })
         
         return {
             'filepath': str(filepath),
@@ -371,6 +548,120 @@ class ReportService:
             'hash_id': hash_id
         }
     
+    def generate_organization_reports(
+        self,
+        targets: List[tuple],
+        sheets_service: Any,
+        llm_service: Any = None,
+        config: Any = None
+    ) -> List[tuple]:
+        """
+        Generate several organization reports concurrently.
+        
+        Each report's LLM analysis is network-bound, so reports run on up to llmMaxConcurrency threads
+        (the LLM service still enforces its own request limits) inside one batch().
+        
+        Args:
+            targets: (company_name, department_filter or None) pairs
+            sheets_service: SheetsService instance to read data
+        
+        Returns:
+            (report result or None, error or None) per target, in target order
+        """
+        def run(target):
+            company_name, department_filter = target
+            try:
+                return self.generate_organization_report(
+                    company_name, sheets_service, department_filter, llm_service, config
+                ), None
+            except Exception as e:
+                return None, e
+        
+        if not targets:
+            return []
+        max_workers = max(1, min((config or {}).get('llmMaxConcurrency') or 1, len(targets)))
+        # Reuse the caller's batch if there is one
+        in_batch = self._url_batch is not None
+        with contextlib.nullcontext() if in_batch else self.batch():
+            if max_workers == 1:
+                return [run(target) for target in targets]
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                return list(executor.map(run, targets))
+    
+    def _organization_sources(self, sheets_service: Any) -> Optional[tuple]:
+        """
+        PM1Final rows grouped by company plus the respondent lookups, as (rows_by_company, respondent_map,
+        department_map), or None when the sheets could not be read. Callers hold _org_sources_lock.
+        """
+        # Respondent lookups are reused for RESPONDENT_CACHE_TTL seconds and PM1Final rows (grouped by
+        # company) for PM1FINAL_CACHE_TTL seconds, e.g. several companies or departments in one batch.
+        # PM1Final rows are re-read at once for another sheets service or after it wrote PM1Final, so a
+        # report right after a pipeline run in the same process includes the new respondents.
+        rows_key = (sheets_service, sheets_service.pm1final_writes)
+        respondents_sheet = sheets_service.config['respondentsSheet']
+        now = time.monotonic()
+        cached = self._respondent_lookup
+        if cached and cached[0] != (sheets_service, respondents_sheet):
+            cached = None
+        if cached and now - self._respondent_lookup_time >= self.RESPONDENT_CACHE_TTL:
+            cached = None
+        rows_by_company = self._pm1final_rows
+        if rows_by_company is not None and now - self._pm1final_rows_time >= self.PM1FINAL_CACHE_TTL:
+            rows_by_company = None
+        if rows_by_company is not None and self._pm1final_rows_key != rows_key:
+            rows_by_company = None
+        
+        sheet_names = []
+        cell_ranges = []
+        if rows_by_company is None:
+            # PM1Final data rows only, columns A:K - the header and trailing columns are never used
+            sheet_names.append('PM1Final')
+            cell_ranges.append('A2:K')
+        if not cached:
+            sheet_names.append(respondents_sheet)
+            cell_ranges.append(None)
+        
+        if sheet_names:
+            # Whatever is stale is read in a single batchGet round trip
+            sheet_values = sheets_service.batch_get(sheet_names, cell_ranges)
+            if not sheet_values or len(sheet_values) < len(sheet_names):
+                return None
+            fetched = iter(sheet_values)
+            if rows_by_company is None:
+                # Group complete rows (11+ columns) by Company_Name once for every company
+                rows_by_company = defaultdict(list)
+                for row in next(fetched):
+                    if len(row) >= 11:
+                        rows_by_company[row[1].strip()].append(row)
+                self._pm1final_rows = rows_by_company
+                self._pm1final_rows_time = time.monotonic()
+                self._pm1final_rows_key = rows_key
+            if not cached:
+                resp_values = next(fetched)
+        
+        if cached:
+            _, respondent_map, department_map = cached
+        else:
+            # One pass over the respondents sheet builds both lookups; only name and department are needed,
+            # so answers are not parsed. respondent_map covers complete rows (20+ columns, as in
+            # get_respondent_rows), department_map every row with a department column (column 4).
+            respondent_map = {}
+            department_map = {}
+            for row in resp_values[1:]:
+                if len(row) <= 5:
+                    continue
+                resp_id = str(row[0] or '').strip()
+                dept = str(row[4] or '').strip()
+                if resp_id:
+                    department_map[resp_id] = dept
+                if len(row) >= 20:
+                    respondent_map[resp_id] = (sheets_service.respondent_name(row), dept)
+            
+            self._respondent_lookup = ((sheets_service, respondents_sheet), respondent_map, department_map)
+            self._respondent_lookup_time = time.monotonic()
+        
+        return rows_by_company, respondent_map, department_map
+    
     def _read_organization_data(
         self,
         company_name: str,
@@ -378,76 +669,49 @@ class ReportService:
         department_filter: Optional[str]
     ) -> Dict[str, Any]:
         """Read and aggregate organization data from PM1Final sheet."""
-        pm1final_sheet = sheets_service._get_sheet('PM1Final')
-        if not pm1final_sheet:
-            return {'count': 0, 'data': []}
-        
-        values = pm1final_sheet.get_all_values()
-        if len(values) <= 1:
+        # Only one report at a time refreshes the shared sheet data; concurrent reports then reuse it
+        with self._org_sources_lock:
+            sources = self._organization_sources(sheets_service)
+        if sources is None:
             return {'count': 0, 'data': []}
-        
-        # Read respondents to get department info
-        respondents = sheets_service.get_respondent_rows()
-        respondent_map = {r['id']: r for r in respondents}
-        
-        # Read department info directly from respondents sheet (column 4)
-        respondents_sheet = sheets_service._get_sheet(sheets_service.config['respondentsSheet'])
-        department_map = {}
-        if respondents_sheet:
-            resp_values = respondents_sheet.get_all_values()
-            for row in resp_values[1:]:
-                if len(row) > 5:
-                    resp_id = str(row[0] or '').strip()
-                    dept = str(row[4] or '').strip() if len(row) > 4 else ''
-                    if resp_id:
-                        department_map[resp_id] = dept
+        rows_by_company, respondent_map, department_map = sources
         
         org_data = []
-        for row in values[1:]:
-            if len(row) < 11:
-                continue
+        # Department values in the lookups are already stripped; strip the filter once
+        wanted_department = department_filter.strip() if department_filter else None
+        # Only the company's rows are parsed
+        for row in rows_by_company.get(company_name.strip(), ()):
+            # Rows are at least 11 wide here, so columns unpack without per-column bounds checks
+            respondent_id, _, _, total_cell, primary_cell, sub_cell, process_cell, aes_cell, _, ai_use_level, _ = row[:11]
             
-            row_company = row[1] if len(row) > 1 else ''  # Company_Name column
-            if row_company.strip() != company_name.strip():
-                continue
-            
-            respondent_id = row[0] if len(row) > 0 else ''
-            respondent = respondent_map.get(respondent_id, {})
+            respondent_name, respondent_dept = respondent_map.get(respondent_id, ('', ''))
             
-            # Filter by department if specified (department is in column 4 of respondents sheet)
-            if department_filter:
-                # Try to get department from respondent data or from respondents sheet
-                dept = ''
-                if respondent_id in respondent_map:
-                    dept = respondent_map[respondent_id].get('department', '')
-                if not dept and len(row) > 4:
-                    # Try to get from PM1Final row if available (though it's not stored there)
-                    pass
-                if dept.strip() != department_filter.strip():
-                    continue
+            # Filter by department if specified (department is in column 4 of respondents sheet),
+            # before any of the row's JSON columns are parsed
+            if wanted_department is not None and respondent_dept != wanted_department:
+                continue
             
             try:
-                total_score = float(row[3]) if len(row) > 3 and row[3] else 0
-                scores_primary = json.loads(row[4]) if len(row) > 4 and row[4] else {}
-                scores_sub = json.loads(row[5]) if len(row) > 5 and row[5] else {}
-                process_scores = json.loads(row[6]) if len(row) > 6 and row[6] else {}
-                aes_scores = json.loads(row[7]) if len(row) > 7 and row[7] else {}
-                ai_use_level = row[9] if len(row) > 9 else ''
+                total_score = float(total_cell) if total_cell else 0
+                scores_primary = json_loads(primary_cell) if primary_cell else {}
+                scores_sub = json_loads(sub_cell) if sub_cell else {}
+                process_scores = json_loads(process_cell) if process_cell else {}
+                aes_scores = json_loads(aes_cell) if aes_cell else {}
                 
                 # Get department from department_map
                 department = department_map.get(respondent_id, '')
                 
-                org_data.append({
-                    'respondent_id': respondent_id,
-                    'name': respondent.get('name', ''),
-                    'department': department,
-                    'total_score': total_score,
-                    'scores_primary': scores_primary,
-                    'scores_sub': scores_sub,
-                    'process': process_scores,
-                    'aes': aes_scores,
-                    'ai_use_level': ai_use_level
-                })
+                org_data.append(_OrgRecord(
+                    respondent_id=respondent_id,
+                    name=respondent_name,
+                    department=department,
+                    total_score=total_score,
+                    scores_primary=scores_primary,
+                    scores_sub=scores_sub,
+                    process=process_scores,
+                    aes=aes_scores,
+                    ai_use_level=ai_use_level
+                ))
             except (ValueError, json.JSONDecodeError) as e:
                 print(f"Warning: Error parsing row for {respondent_id}: {e}")
                 continue
@@ -462,103 +726,128 @@ class ReportService:
         self, 
         org_data: Dict[str, Any], 
         llm_service: Any = None, 
-        config: Any = None
+        config: Any = None,
+        now: Optional[datetime] = None
     ) -> Dict[str, Any]:
         """Prepare data structure for organization report."""
+        if now is None:
+            now = datetime.now()
         data_list = org_data['data']
         count = org_data['count']
         
         if count == 0:
             return {}
         
+        # Categories aggregated per respondent (PRIMARY uses official categories, PROCESS/AES English keys)
+        primary_categories = ['問題理解', '論理思考', '仮説構築', 'AI指示', 'AI検証/優先順位判断']
+        # (category, old category name still found in older PM1Final rows, or None)
+        primary_pairs = [(category, self.PRIMARY_OLD_NAMES.get(category)) for category in primary_categories]
+        process_categories_en = [cat for cat, _ in self.PROCESS_PAIRS]
+        aes_categories = ['clarity', 'logic', 'relevance']
+        # (category, 'aes_' key) pairs built once rather than formatting the key per respondent
+        aes_keys = [(cat, f'aes_{cat}') for cat in aes_categories]
+        
+        total_scores = []
+        primary_values = {category: [] for category in primary_categories}
+        process_values = {cat: [] for cat in process_categories_en}
+        aes_values = {cat: [] for cat in aes_categories}
+        ai_level_counts = {}
+        ai_indicators = []
+        departments = set()
+        
+        # Bound append methods per category, so the loop does no per-value dict lookup of the target list
+        primary_columns = [(category, old_name, primary_values[category].append) for category, old_name in primary_pairs]
+        process_columns = [(cat, process_values[cat].append) for cat in process_categories_en]
+        aes_columns = [(cat, aes_key, aes_values[cat].append) for cat, aes_key in aes_keys]
+        
+        # Single pass over the respondents collects every per-category series and count used below
+        for d in data_list:
+            total_scores.append(d.total_score)
+            
+            primary_get = d.scores_primary.get
+            for category, old_name, append in primary_columns:
+                # Support both old and new category names
+                cat_score = primary_get(category, 0)
+                if cat_score == 0 and old_name:
+                    # Try old names for backward compatibility
+                    cat_score = primary_get(old_name, 0)
+                if cat_score > 0:
+                    append(cat_score)
+            
+            process_get = d.process.get
+            for cat, append in process_columns:
+                score = process_get(cat, 0)
+                if score > 0:
+                    append(score)
+            
+            aes_get = d.aes.get
+            for cat, aes_key, append in aes_columns:
+                # Support both 'aes_clarity' format and 'clarity' format
+                score = aes_get(aes_key, aes_get(cat, 0))
+                if score > 0:
+                    append(score)
+            
+            # Count AI use levels from actual data
+            level = d.ai_use_level
+            if level:
+                ai_level_counts[level] = ai_level_counts.get(level, 0) + 1
+            
+            # AI-related indicators for instability analysis
+            ai_score_1 = primary_get('AI指示', 0) or primary_get('ai指示', 0)
+            ai_score_2 = primary_get('AI検証/優先順位判断', 0) or primary_get('AI検証', 0)
+            if ai_score_1 > 0 and ai_score_2 > 0:
+                ai_avg = (ai_score_1 + ai_score_2) / 2
+                ai_indicators.append(ai_avg)
+            
+            # Department information (if filtered by department, show it; otherwise show all departments)
+            if d.department:
+                departments.add(d.department)
+        
         # Calculate average total score
-        total_scores = [d['total_score'] for d in data_list]
         avg_total_score = statistics.mean(total_scores) if total_scores else 0
         
-        # Aggregate PRIMARY scores by category (using official categories)
-        primary_categories = ['問題理解', '論理思考', '仮説構築', 'AI指示', 'AI検証/優先順位判断']
+        # Summarize PRIMARY scores by category
         primary_distributions = {}
         primary_means = []
-        
         for category in primary_categories:
-            scores = []
-            for d in data_list:
-                # Support both old and new category names
-                cat_score = d['scores_primary'].get(category, 0)
-                if cat_score == 0:
-                    # Try old names for backward compatibility
-                    if category == '論理思考':
-                        cat_score = d['scores_primary'].get('論理構成', 0)
-                    elif category == 'AI検証/優先順位判断':
-                        cat_score = d['scores_primary'].get('AI検証', 0)
-                if cat_score > 0:
-                    scores.append(cat_score)
+            scores = primary_values[category]
             if scores:
-                mean_score = statistics.mean(scores)
-                primary_means.append(mean_score)
+                summary = _score_summary(scores)
+                primary_means.append(summary['mean'])
                 primary_distributions[category] = {
-                    'min': round(min(scores), 1),
-                    'q1': round(statistics.quantiles(scores, n=4)[0] if len(scores) > 1 else scores[0], 1),
-                    'median': round(statistics.median(scores), 1),
-                    'q3': round(statistics.quantiles(scores, n=4)[2] if len(scores) > 1 else scores[0], 1),
-                    'max': round(max(scores), 1),
-                    'mean': round(mean_score, 1),
+                    'min': round(summary['min'], 1),
+                    'q1': round(summary['q1'], 1),
+                    'median': round(summary['median'], 1),
+                    'q3': round(summary['q3'], 1),
+                    'max': round(summary['max'], 1),
+                    'mean': round(summary['mean'], 1),
                     'values': [round(s, 1) for s in scores]
                 }
         
         # Calculate PRIMARY average (average of all PRIMARY category means)
         primary_avg = round(statistics.mean(primary_means), 1) if primary_means else 0
         
-        # Aggregate PROCESS scores (use Japanese labels)
-        process_categories_en = ['clarity', 'structure', 'hypothesis', 'prompt clarity', 'consistency']
+        # Summarize PROCESS scores (use Japanese labels)
         process_averages = {}
-        process_values = {cat: [] for cat in process_categories_en}
         process_means = []
-        
-        for d in data_list:
-            for cat in process_categories_en:
-                score = d['process'].get(cat, 0)
-                if score > 0:
-                    process_values[cat].append(score)
-        
-        for cat in process_categories_en:
+        for cat, jp_label in self.PROCESS_PAIRS:
             if process_values[cat]:
-                mean_score = statistics.mean(process_values[cat])
-                process_means.append(mean_score)
-                jp_label = self.PROCESS_LABELS_JP[cat]
+                summary = _score_summary(process_values[cat])
+                process_means.append(summary['mean'])
                 process_averages[jp_label] = {
-                    'mean': round(mean_score, 1),
-                    'std': round(statistics.stdev(process_values[cat]) if len(process_values[cat]) > 1 else 0, 1),
-                    'min': round(min(process_values[cat]), 1),
-                    'max': round(max(process_values[cat]), 1),
+                    'mean': round(summary['mean'], 1),
+                    'std': round(summary['std'], 1),
+                    'min': round(summary['min'], 1),
+                    'max': round(summary['max'], 1),
                     'values': [round(s, 1) for s in process_values[cat]]
                 }
         
         # Calculate PROCESS average (average of all PROCESS category means)
         process_avg = round(statistics.mean(process_means), 1) if process_means else 0
         
-        # Aggregate AES scores
-        aes_categories = ['clarity', 'logic', 'relevance']
+        # Summarize AES scores
         aes_averages = {}
-        aes_values = {cat: [] for cat in aes_categories}
         aes_means = []
-        
-        for d in data_list:
-            aes_scores = d.get('aes', {})
-            for cat in aes_categories:
-                # Support both 'aes_clarity' format and 'clarity' format
-                score = aes_scores.get(f'aes_{cat}', aes_scores.get(cat, 0))
-                if score == 0:
-                    # Try alternative formats
-                    if cat == 'clarity':
-                        score = aes_scores.get('aes_clarity', 0)
-                    elif cat == 'logic':
-                        score = aes_scores.get('aes_logic', 0)
-                    elif cat == 'relevance':
-                        score = aes_scores.get('aes_relevance', 0)
-                if score > 0:
-                    aes_values[cat].append(score)
-        
         aes_labels_jp = {
             'clarity': '明瞭さ',
             'logic': '論理性',
@@ -567,27 +856,20 @@ class ReportService:
         
         for cat in aes_categories:
             if aes_values[cat]:
-                mean_score = statistics.mean(aes_values[cat])
-                aes_means.append(mean_score)
+                summary = _score_summary(aes_values[cat])
+                aes_means.append(summary['mean'])
                 jp_label = aes_labels_jp[cat]
                 aes_averages[jp_label] = {
-                    'mean': round(mean_score, 1),
-                    'std': round(statistics.stdev(aes_values[cat]) if len(aes_values[cat]) > 1 else 0, 1),
-                    'min': round(min(aes_values[cat]), 1),
-                    'max': round(max(aes_values[cat]), 1),
+                    'mean': round(summary['mean'], 1),
+                    'std': round(summary['std'], 1),
+                    'min': round(summary['min'], 1),
+                    'max': round(summary['max'], 1),
                     'values': [round(s, 1) for s in aes_values[cat]]
                 }
         
         # Calculate AES average (average of all AES component means)
         aes_avg = round(statistics.mean(aes_means), 1) if aes_means else 0
         
-        # Count AI use levels from actual data
-        ai_level_counts = {}
-        for d in data_list:
-            level = d.get('ai_use_level', '')
-            if level:
-                ai_level_counts[level] = ai_level_counts.get(level, 0) + 1
-        
         # Calculate maturity level (S/A/B/C/D) based on average total score (0.1-5.0 scale)
         # Level 5 (S): 4.1-5.0, Level 4 (A): 3.1-4.0, Level 3 (B): 2.1-3.0, Level 2 (C): 1.1-2.0, Level 1 (D): 0.1-1.0
         maturity_level = 'D'
@@ -631,8 +913,7 @@ class ReportService:
         
         # Calculate variance for PROCESS categories
         process_variance_metrics = {}
-        for cat in process_categories_en:
-            jp_label = self.PROCESS_LABELS_JP[cat]
+        for _, jp_label in self.PROCESS_PAIRS:
             if jp_label in process_averages:
                 avg_data = process_averages[jp_label]
                 std = avg_data['std']
@@ -645,15 +926,6 @@ class ReportService:
                     'range': round(range_val, 1)
                 }
         
-        # AI-related indicators for instability analysis
-        ai_indicators = []
-        for d in data_list:
-            ai_score_1 = d['scores_primary'].get('AI指示', 0) or d['scores_primary'].get('ai指示', 0)
-            ai_score_2 = d['scores_primary'].get('AI検証/優先順位判断', 0) or d['scores_primary'].get('AI検証', 0)
-            if ai_score_1 > 0 and ai_score_2 > 0:
-                ai_avg = (ai_score_1 + ai_score_2) / 2
-                ai_indicators.append(ai_avg)
-        
         # Calculate AI score variance
         ai_variance = {}
         if ai_indicators and len(ai_indicators) > 1:
@@ -683,79 +955,76 @@ class ReportService:
                     raise ValueError("promptOrg not configured in Config sheet. Required for organization report generation.")
                 
                 # Build data section for organizational diagnosis
-                prompt_lines = []
-                prompt_lines.append("# Organization Diagnosis Report Generation")
-                prompt_lines.append(f"Company: {org_data['company_name']}")
-                prompt_lines.append(f"Respondents: {count}")
-                prompt_lines.append("")
-                prompt_lines.append("## 1. Judgment Base Maturity Level")
-                prompt_lines.append(f"Average Total Score: {round(avg_total_score, 1)}")
-                prompt_lines.append(f"Maturity Level: {maturity_level} (Level {maturity_level_num})")
+                buf = io.StringIO()
+                w = buf.write
+                w(
+                    "# Organization Diagnosis Report Generation\n"
+                    f"Company: {org_data['company_name']}\n"
+                    f"Respondents: {count}\n"
+                    "\n"
+                    "## 1. Judgment Base Maturity Level\n"
+                    f"Average Total Score: {round(avg_total_score, 1)}\n"
+                    f"Maturity Level: {maturity_level} (Level {maturity_level_num})\n"
+                )
                 if maturity_level_num == 5:
-                    prompt_lines.append("Status: Judgment base highly integrated")
+                    w("Status: Judgment base highly integrated\n")
                 elif maturity_level_num == 4:
-                    prompt_lines.append("Status: Judgment base functioning organizationally")
+                    w("Status: Judgment base functioning organizationally\n")
                 elif maturity_level_num == 3:
-                    prompt_lines.append("Status: Judgment base not yet organized")
+                    w("Status: Judgment base not yet organized\n")
                 elif maturity_level_num == 2:
-                    prompt_lines.append("Status: Judgment base unstable")
+                    w("Status: Judgment base unstable\n")
                 else:
-                    prompt_lines.append("Status: Judgment base unestablished")
-                prompt_lines.append("")
-                prompt_lines.append("## 2. Score Variance (Dispersion)")
-                prompt_lines.append(f"Total Score Std Dev: {total_score_std}")
-                prompt_lines.append(f"Total Score CV: {total_score_cv}%")
-                prompt_lines.append("")
-                prompt_lines.append("### PRIMARY Skill Variance:")
+                    w("Status: Judgment base unestablished\n")
+                w(
+                    "\n"
+                    "## 2. Score Variance (Dispersion)\n"
+                    f"Total Score Std Dev: {total_score_std}\n"
+                    f"Total Score CV: {total_score_cv}%\n"
+                    "\n"
+                    "### PRIMARY Skill Variance:\n"
+                )
                 for category, metrics in primary_variance_metrics.items():
                     dist = primary_distributions[category]
-                    prompt_lines.append(f"- {category}: 平均{dist['mean']}, 標準偏差{metrics['std']}, 範囲{metrics['range']} (最小{dist['min']}～最大{dist['max']})")
-                prompt_lines.append("")
-                prompt_lines.append("### PROCESS Evaluation Variance:")
+                    w(f"- {category}: 平均{dist['mean']}, 標準偏差{metrics['std']}, 範囲{metrics['range']} (最小{dist['min']}～最大{dist['max']})\n")
+                w("\n### PROCESS Evaluation Variance:\n")
                 for category, metrics in process_variance_metrics.items():
                     avg_data = process_averages[category]
-                    prompt_lines.append(f"- {category}: Mean {avg_data['mean']}, Std Dev {metrics['std']}, Range {metrics['range']} (Min {avg_data['min']} - Max {avg_data['max']})")
-                prompt_lines.append("")
-                prompt_lines.append("## 3. AI Usage Related Scores")
+                    w(f"- {category}: Mean {avg_data['mean']}, Std Dev {metrics['std']}, Range {metrics['range']} (Min {avg_data['min']} - Max {avg_data['max']})\n")
+                w("\n## 3. AI Usage Related Scores\n")
                 if ai_variance:
-                    prompt_lines.append(f"AI Related Score Mean: {ai_variance['mean']}")
-                    prompt_lines.append(f"AI Related Score Std Dev: {ai_variance['std']}")
-                    prompt_lines.append(f"AI Related Score Range: {ai_variance['min']} - {ai_variance['max']}")
+                    w(
+                        f"AI Related Score Mean: {ai_variance['mean']}\n"
+                        f"AI Related Score Std Dev: {ai_variance['std']}\n"
+                        f"AI Related Score Range: {ai_variance['min']} - {ai_variance['max']}\n"
+                    )
                 else:
-                    prompt_lines.append("AI Related Scores: Insufficient data")
-                prompt_lines.append("")
-                prompt_lines.append("### AI Usage Level Distribution:")
+                    w("AI Related Scores: Insufficient data\n")
+                w("\n### AI Usage Level Distribution:\n")
                 for level, count_val in ai_level_counts.items():
-                    prompt_lines.append(f"- {level}: {count_val} people")
-                prompt_lines.append("")
-                prompt_lines.append("## 4. Detailed Score Distribution")
-                prompt_lines.append("### PRIMARY Skill Distribution:")
+                    w(f"- {level}: {count_val} people\n")
+                w("\n## 4. Detailed Score Distribution\n### PRIMARY Skill Distribution:\n")
                 for category, dist in primary_distributions.items():
-                    prompt_lines.append(f"- {category}: Mean {dist['mean']}, Median {dist['median']}, Q1 {dist['q1']}, Q3 {dist['q3']}, Min {dist['min']}, Max {dist['max']}")
-                prompt_lines.append("")
-                prompt_lines.append("### PROCESS Evaluation Distribution:")
+                    w(f"- {category}: Mean {dist['mean']}, Median {dist['median']}, Q1 {dist['q1']}, Q3 {dist['q3']}, Min {dist['min']}, Max {dist['max']}\n")
+                w("\n### PROCESS Evaluation Distribution:\n")
                 for category, avg in process_averages.items():
-                    prompt_lines.append(f"- {category}: 平均{avg['mean']}, 標準偏差{avg['std']}, 最小{avg['min']}, 最大{avg['max']}")
-                prompt_lines.append("")
-                prompt_lines.append("---")
-                prompt_lines.append("")
-                prompt_lines.append("## Analysis Instructions")
-                prompt_lines.append(prompt_text)
+                    w(f"- {category}: 平均{avg['mean']}, 標準偏差{avg['std']}, 最小{avg['min']}, 最大{avg['max']}\n")
+                w(f"\n---\n\n## Analysis Instructions\n{prompt_text}")
                 
-                prompt = "\n".join(prompt_lines)
-                response = llm_service._invoke_llm(prompt, 1, "You are an expert organizational diagnosis analyst. Focus on structural issues, not individual blame. Output ONLY valid JSON with all text in Japanese.")
+                prompt = buf.getvalue()
+                parsed = llm_service.run_report_analysis(
+                    prompt,
+                    "You are an expert organizational diagnosis analyst. Focus on structural issues, not individual blame. Output ONLY valid JSON with all text in Japanese."
+                )
                 
-                if response:
-                    try:
-                        parsed = json.loads(response)
-                        maturity_description = parsed.get('maturity_description', '')
-                        structural_analysis = parsed.get('structural_analysis', '')
-                        variance_analysis = parsed.get('variance_analysis', '')
-                        ai_instability_explanation = parsed.get('ai_instability_explanation', '')
-                        actionable_recommendations = parsed.get('actionable_recommendations', '')
-                    except json.JSONDecodeError:
-                        print("Warning: Failed to parse LLM response for organizational analysis")
-                        print(f"Response: {response[:500]}")
+                if parsed:
+                    maturity_description = parsed.get('maturity_description', '')
+                    structural_analysis = parsed.get('structural_analysis', '')
+                    variance_analysis = parsed.get('variance_analysis', '')
+                    ai_instability_explanation = parsed.get('ai_instability_explanation', '')
+                    actionable_recommendations = parsed.get('actionable_recommendations', '')
+                else:
+                    print("Warning: No valid JSON response for organizational analysis")
             except Exception as e:
                 print(f"Warning: Failed to generate organizational analysis: {e}")
                 import traceback
@@ -769,14 +1038,8 @@ class ReportService:
             trend_analysis_parts.append(variance_analysis)
         trend_analysis = ' '.join(trend_analysis_parts) if trend_analysis_parts else ''
         
-        # Get CTA section from first respondent's data if available, otherwise use default
-        cta_section_html = ''
-        if data_list:
-            cta_section_html = data_list[0].get('cta_section_html', '')
-        
-        # Default CTA section for organization reports if not provided
-        if not cta_section_html:
-            cta_section_html = '''<div class="cta-section">
+        # Default CTA section for organization reports (PM1Final rows carry no CTA of their own)
+        cta_section_html = '''<div class="cta-section">
 <div class="cta-title">本診断（AI-CATS）への誘導</div>
 <div class="cta-content">
 <p><strong>組織診断の必要性</strong></p>
@@ -794,12 +1057,6 @@ class ReportService:
 <a href="https://ai-cats.gs-group.jp/@ai-cats1" target="_blank" class="cta-button">AI-CATS本診断へ</a>
 </div>'''
         
-        # Get department information (if filtered by department, show it; otherwise show all departments)
-        departments = set()
-        for d in data_list:
-            dept = d.get('department', '')
-            if dept:
-                departments.add(dept)
         department_display = ', '.join(sorted(departments)) if departments else ''
         
         return {
@@ -827,20 +1084,20 @@ class ReportService:
             'ai_variance': ai_variance,
             'ai_level_distribution': ai_level_counts,
             'trend_analysis': trend_analysis,
-            'generation_date': datetime.now().strftime('%Y年%m月%d日'),
+            'generation_date': _format_report_date(now.date()),
             'cta_section_html': cta_section_html
         }
     
     
-    def _generate_organization_html(self, data: Dict[str, Any]) -> str:
-        """Generate HTML content for organization report."""
+    def _generate_organization_html(self, data: Dict[str, Any]) -> TemplateStream:
+        """Generate HTML content for organization report (as a stream of rendered chunks)."""
         # Load template
         template = self._load_template("organization_report.html")
         
         # Prepare data for template (no HTML generation, only JSON data)
-        primary_data_json = json.dumps(data['primary_distributions'], ensure_ascii=False)
-        process_data_json = json.dumps(data['process_averages'], ensure_ascii=False)
-        aes_data_json = json.dumps(data.get('aes_averages', {}), ensure_ascii=False)
+        primary_data_json = json_dumps(data['primary_distributions'])
+        process_data_json = json_dumps(data['process_averages'])
+        aes_data_json = json_dumps(data.get('aes_averages', {}))
         
         # Get maturity level and description
         maturity_level = data.get('maturity_level', 'D')
@@ -848,22 +1105,8 @@ class ReportService:
         maturity_description = data.get('maturity_description', '')
         maturity_description_html = f'<div class="maturity-description">{maturity_description}</div>' if maturity_description else ''
         
-        # Get analysis sections
-        structural_analysis = data.get('structural_analysis', '')
-        variance_analysis = data.get('variance_analysis', '')
-        ai_instability_explanation = data.get('ai_instability_explanation', '')
-        actionable_recommendations = data.get('actionable_recommendations', '')
-        
-        # Create individual slide items for carousel
-        analysis_slides = []
-        if structural_analysis:
-            analysis_slides.append(f'<div class="analysis-slide"><div class="analysis-section"><div class="analysis-title">判断が揃わない原因（構造的理由）</div><div class="analysis-content">{structural_analysis}</div></div></div>')
-        if variance_analysis:
-            analysis_slides.append(f'<div class="analysis-slide"><div class="analysis-section"><div class="analysis-title">スコアのばらつきと揃っていないポイント</div><div class="analysis-content">{variance_analysis}</div></div></div>')
-        if ai_instability_explanation:
-            analysis_slides.append(f'<div class="analysis-slide"><div class="analysis-section"><div class="analysis-title">AI活用が不安定な理由</div><div class="analysis-content">{ai_instability_explanation}</div></div></div>')
-        if actionable_recommendations:
-            analysis_slides.append(f'<div class="analysis-slide"><div class="analysis-section recommendations-section"><div class="analysis-title">次に何をすればいいか（選択肢）</div><div class="analysis-content">{actionable_recommendations}</div></div></div>')
+        # Create individual slide items for carousel (organization analysis sections)
+        analysis_slides = _analysis_slides(data, _ORGANIZATION_SLIDES)
         
         # Wrap slides in carousel container (draggable, no buttons)
         if analysis_slides:
@@ -878,9 +1121,8 @@ class ReportService:
         department = data.get('department', '')
         department_html = f' / {department}' if department else ''
         
-        # Replace placeholders using Template.safe_substitute
-        template_obj = Template(template)
-        return template_obj.safe_substitute(
+        # Render the precompiled Jinja2 template
+        return template.stream(
             company_name=data['company_name'],
             department_html=department_html,
             generation_date=data['generation_date'],
@@ -2,6 +2,7 @@
 Scoring Engine - Implements weighted scoring, rules, and validation.
 """
 
+from collections import defaultdict
 from typing import Dict, Any, List, Optional
 from core.utils import parse_number
 from core.category_mapper import (
@@ -71,13 +72,12 @@ class ScoringEngine:
         try:
             # Extract per-question scores
             per_question = {}
-            primary_scores = {}
-            sub_scores = {}
-            process_scores = {}
-            # AES scores: collect by component (clarity, logic, relevance) not by question
-            aes_clarity_list = []
-            aes_logic_list = []
-            aes_relevance_list = []
+            primary_scores = defaultdict(list)
+            sub_scores = defaultdict(list)
+            process_scores = defaultdict(list)
+            # AES scores: running (sum, count) by component (clarity, logic, relevance) not by question
+            aes_clarity_sum = aes_logic_sum = aes_relevance_sum = 0.0
+            aes_clarity_n = aes_logic_n = aes_relevance_n = 0
             
             # Process each question Q1-Q6
             for question in questions:
@@ -125,7 +125,8 @@ class ScoringEngine:
                 process_adjusted = max(1.0, min(5.0, process))
                 
                 # Calculate AES score: (clarity + logic + relevance) / 3
-                aes_score = (aes_clarity + aes_logic + aes_relevance) / 3 if (aes_clarity + aes_logic + aes_relevance) > 0 else 0
+                aes_total = aes_clarity + aes_logic + aes_relevance
+                aes_score = aes_total / 3 if aes_total > 0 else 0
                 
                 # Store per-question data (1 decimal place)
                 per_question[question_id] = {
@@ -139,59 +140,46 @@ class ScoringEngine:
                     'difference_note': pm05_data.get('difference_note', '')  # From PM05 Raw
                 }
                 
-                # Use adjusted scores for aggregation
-                primary = primary_adjusted
-                sub = sub_adjusted
-                process = process_adjusted
+                # Aggregate adjusted scores by category (all three categories are mapped at this point)
+                primary_scores[primary_category].append(primary_adjusted)
+                sub_scores[sub_category].append(sub_adjusted)
+                process_scores[process_item].append(process_adjusted)
                 
-                # Aggregate scores by category
-                if primary_category:
-                    if primary_category not in primary_scores:
-                        primary_scores[primary_category] = []
-                    primary_scores[primary_category].append(primary)
-                
-                if sub_category:
-                    if sub_category not in sub_scores:
-                        sub_scores[sub_category] = []
-                    sub_scores[sub_category].append(sub)
-                
-                if process_item:
-                    if process_item not in process_scores:
-                        process_scores[process_item] = []
-                    process_scores[process_item].append(process)
-                
-                # Collect AES components for aggregation (not per-question)
+                # Accumulate AES components for aggregation (not per-question)
                 if aes_clarity > 0:
-                    aes_clarity_list.append(aes_clarity)
+                    aes_clarity_sum += aes_clarity
+                    aes_clarity_n += 1
                 if aes_logic > 0:
-                    aes_logic_list.append(aes_logic)
+                    aes_logic_sum += aes_logic
+                    aes_logic_n += 1
                 if aes_relevance > 0:
-                    aes_relevance_list.append(aes_relevance)
+                    aes_relevance_sum += aes_relevance
+                    aes_relevance_n += 1
             
             # Calculate averages for aggregated scores
             # Ensure all official categories are included (even if empty)
             # All averages must be rounded to 1 decimal place to avoid floating point precision issues
             primary_avg = {}
             for category in self.OFFICIAL_PRIMARY_CATEGORIES:
-                if category in primary_scores and primary_scores[category]:
-                    avg = sum(primary_scores[category]) / len(primary_scores[category])
-                    primary_avg[category] = round(avg, 1)
+                scores = primary_scores.get(category)
+                if scores:
+                    primary_avg[category] = round(sum(scores) / len(scores), 1)
                 else:
                     primary_avg[category] = 0.0
             
             sub_avg = {}
             for category in self.OFFICIAL_SUB_CATEGORIES:
-                if category in sub_scores and sub_scores[category]:
-                    avg = sum(sub_scores[category]) / len(sub_scores[category])
-                    sub_avg[category] = round(avg, 1)
+                scores = sub_scores.get(category)
+                if scores:
+                    sub_avg[category] = round(sum(scores) / len(scores), 1)
                 else:
                     sub_avg[category] = 0.0
             
             process_avg = {}
             for item in self.OFFICIAL_PROCESS_ITEMS:
-                if item in process_scores and process_scores[item]:
-                    avg = sum(process_scores[item]) / len(process_scores[item])
-                    process_avg[item] = round(avg, 1)
+                scores = process_scores.get(item)
+                if scores:
+                    process_avg[item] = round(sum(scores) / len(scores), 1)
                 else:
                     process_avg[item] = 0.0
             
@@ -201,10 +189,10 @@ class ScoringEngine:
             avg_sub = sum(sub_avg.values()) / len(sub_avg) if sub_avg else 0.0
             avg_process = sum(process_avg.values()) / len(process_avg) if process_avg else 0.0
             # Calculate AES averages by component (not per-question)
-            avg_aes_clarity = sum(aes_clarity_list) / len(aes_clarity_list) if aes_clarity_list else 0.0
-            avg_aes_logic = sum(aes_logic_list) / len(aes_logic_list) if aes_logic_list else 0.0
-            avg_aes_relevance = sum(aes_relevance_list) / len(aes_relevance_list) if aes_relevance_list else 0.0
-            avg_aes = (avg_aes_clarity + avg_aes_logic + avg_aes_relevance) / 3 if (aes_clarity_list or aes_logic_list or aes_relevance_list) else 0.0
+            avg_aes_clarity = aes_clarity_sum / aes_clarity_n if aes_clarity_n else 0.0
+            avg_aes_logic = aes_logic_sum / aes_logic_n if aes_logic_n else 0.0
+            avg_aes_relevance = aes_relevance_sum / aes_relevance_n if aes_relevance_n else 0.0
+            avg_aes = (avg_aes_clarity + avg_aes_logic + avg_aes_relevance) / 3 if (aes_clarity_n or aes_logic_n or aes_relevance_n) else 0.0
             
             # Round intermediate averages to 1 decimal place
             avg_primary = round(avg_primary, 1)
@@ -231,13 +219,14 @@ class ScoringEngine:
             }
             
             # Round all dictionary values to ensure no floating point precision issues
+            # (per-question scores are already rounded when they are stored above)
             result = {
                 'scores_primary': self._round_dict_values(primary_avg, 1),
                 'scores_sub': self._round_dict_values(sub_avg, 1),
                 'process': self._round_dict_values(process_avg, 1),
                 'aes': self._round_dict_values(aes_output, 1),
                 'total_score': round(weighted_total, 1),
-                'per_question': self._round_dict_values(per_question, 1)
+                'per_question': per_question
             }
             
             return result
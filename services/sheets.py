@@ -3,6 +3,7 @@ Google Sheets service - handles all sheet operations for PM01/PM05.
 """
 
 import gspread
+from gspread.utils import fill_gaps
 import re
 import json
 from google.oauth2.service_account import Credentials
@@ -25,6 +26,8 @@ class SheetsService:
         """Initialize the sheets service with configuration."""
         self.config = config
         self._spreadsheet: Optional[gspread.Spreadsheet] = None
+        # Bumped on every PM1Final write, so readers caching PM1Final rows know they are stale
+        self.pm1final_writes = 0
         self._init_client()
     
     def _init_client(self):
@@ -73,6 +76,31 @@ class SheetsService:
         except gspread.exceptions.WorksheetNotFound:
             return None
     
+    def batch_get(
+        self,
+        sheet_names: List[str],
+        cell_ranges: Optional[List[Optional[str]]] = None
+    ) -> Optional[List[List[List[str]]]]:
+        """
+        Reads several sheets in one values.batchGet request (one round trip instead of one per sheet).
+        
+        cell_ranges optionally limits each sheet to an A1 cell range (e.g. 'A2:K'); None reads the whole sheet.
+        Returns the values of each sheet in order (rows padded like get_all_values), or None if the request fails
+        (e.g. a sheet does not exist).
+        """
+        if not self._spreadsheet:
+            return None
+        try:
+            # Quoted A1 sheet ranges (a sheet name alone means all of its cells)
+            ranges = ["'" + name.replace("'", "''") + "'" for name in sheet_names]
+            if cell_ranges:
+                ranges = [f"{r}!{cells}" if cells else r for r, cells in zip(ranges, cell_ranges)]
+            response = self._spreadsheet.values_batch_get(ranges)
+        except gspread.exceptions.APIError as e:
+            print(f"batch_get: Could not read {', '.join(sheet_names)}: {e}")
+            return None
+        return [fill_gaps(value_range.get('values', [])) for value_range in response.get('valueRanges', [])]
+    
     def get_respondent_rows(self) -> List[Dict[str, Any]]:
         """Reads respondent data rows from the configured sheet.
         
@@ -104,7 +132,19 @@ class SheetsService:
             print(f"getRespondentRows: Sheet '{self.config['respondentsSheet']}' not found")
             return []
         
-        values = sheet.get_all_values()
+        return self.parse_respondent_values(sheet.get_all_values())
+    
+    @staticmethod
+    def respondent_name(row: List[str]) -> str:
+        """Full name from a respondents sheet row (columns 2-3: family name, given name)."""
+        # Column 2: お名前/姓 (Family Name)
+        family_name = str(row[2] or '').strip()
+        # Column 3: お名前/名 (Given Name)
+        given_name = str(row[3] or '').strip()
+        return f"{family_name} {given_name}".strip() if family_name and given_name else (family_name or given_name or '').strip()
+    
+    def parse_respondent_values(self, values: List[List[str]]) -> List[Dict[str, Any]]:
+        """Builds respondent dicts from the raw values of the respondents sheet (see get_respondent_rows)."""
         if len(values) <= 1:
             print("getRespondentRows: No data rows found")
             return []
@@ -116,11 +156,7 @@ class SheetsService:
             
             # Column 0: No. (respondent ID)
             respondent_id = str(row[0] or '').strip()
-            # Column 2: お名前/姓 (Family Name)
-            family_name = str(row[2] or '').strip()
-            # Column 3: お名前/名 (Given Name)
-            given_name = str(row[3] or '').strip()
-            name = f"{family_name} {given_name}".strip() if family_name and given_name else (family_name or given_name or '').strip()
+            name = self.respondent_name(row)
             
             # Column 4: 所属部門（部署）名 (Department Name)
             department = str(row[4] or '').strip() if len(row) > 4 else ''
@@ -562,6 +598,7 @@ class SheetsService:
         ]
         
         sheet.append_row(row)
+        self.pm1final_writes += 1
     
     def write_report_url(
         self,
@@ -588,62 +625,83 @@ class SheetsService:
             company_name: Company name (for organization reports, optional)
             department: Department name (for organization reports, optional)
         """
-        if not self._spreadsheet:
-            return
-        
-        # Get sheet name from config based on report type
-        if report_type == 'organization':
-            sheet_name = self.config.get('reportOrgSheet', 'ReportOrganization') if self.config else 'ReportOrganization'
-        else:
-            sheet_name = self.config.get('reportIndSheet', 'ReportIndividual') if self.config else 'ReportIndividual'
-        
-        sheet = self._get_sheet(sheet_name)
-        if not sheet:
-            # Create sheet with appropriate number of columns
-            num_cols = 7 if report_type == 'organization' else 6
-            sheet = self._spreadsheet.add_worksheet(title=sheet_name, rows=1000, cols=num_cols)
-        
-        # Define headers based on report type
-        if report_type == 'organization':
-            headers = [
-                'Hash_ID', 'Company_Name', 'Department', 'Report_URL', 'Filepath', 'Timestamp', 'Created_At'
-            ]
-        else:
-            headers = [
-                'Hash_ID', 'Respondent_ID', 'Report_URL', 'Filepath', 'Timestamp', 'Created_At'
-            ]
+        self.write_report_urls([{
+            'respondent_id': respondent_id,
+            'hash_id': hash_id,
+            'filepath': filepath,
+            'report_url': report_url,
+            'timestamp': timestamp,
+            'report_type': report_type,
+            'company_name': company_name,
+            'department': department
+        }])
+    
+    def write_report_urls(self, entries: List[Dict[str, Any]]):
+        """
+        Writes several report URL mappings (write_report_url keyword arguments) with one append per sheet.
         
-        # Ensure headers exist
-        existing_values = sheet.get_all_values()
-        if len(existing_values) == 0:
-            sheet.append_row(headers)
-        elif existing_values[0] != headers:
-            sheet.insert_row(headers, index=1)
+        The header check runs once per sheet for the whole batch instead of once per report.
+        """
+        if not self._spreadsheet or not entries:
+            return
         
         created_at = self._format_date(datetime.now())
-        
-        # Build row based on report type
-        if report_type == 'organization':
-            row = [
-                hash_id,
-                company_name or respondent_id,
-                department or '',
-                report_url,
-                filepath,
-                timestamp,
-                created_at
-            ]
-        else:
-            row = [
-                hash_id,
-                respondent_id,
-                report_url,
-                filepath,
-                timestamp,
-                created_at
-            ]
-        
-        sheet.append_row(row)
+        rows_by_type: Dict[str, List[List[str]]] = {}
+        for entry in entries:
+            report_type = entry.get('report_type', 'individual')
+            # Build row based on report type
+            if report_type == 'organization':
+                row = [
+                    entry['hash_id'],
+                    entry.get('company_name') or entry['respondent_id'],
+                    entry.get('department') or '',
+                    entry['report_url'],
+                    entry['filepath'],
+                    entry['timestamp'],
+                    created_at
+                ]
+            else:
+                row = [
+                    entry['hash_id'],
+                    entry['respondent_id'],
+                    entry['report_url'],
+                    entry['filepath'],
+                    entry['timestamp'],
+                    created_at
+                ]
+            rows_by_type.setdefault(report_type, []).append(row)
+        
+        for report_type, rows in rows_by_type.items():
+            # Get sheet name from config based on report type
+            if report_type == 'organization':
+                sheet_name = self.config.get('reportOrgSheet', 'ReportOrganization') if self.config else 'ReportOrganization'
+            else:
+                sheet_name = self.config.get('reportIndSheet', 'ReportIndividual') if self.config else 'ReportIndividual'
+            
+            sheet = self._get_sheet(sheet_name)
+            if not sheet:
+                # Create sheet with appropriate number of columns
+                num_cols = 7 if report_type == 'organization' else 6
+                sheet = self._spreadsheet.add_worksheet(title=sheet_name, rows=1000, cols=num_cols)
+            
+            # Define headers based on report type
+            if report_type == 'organization':
+                headers = [
+                    'Hash_ID', 'Company_Name', 'Department', 'Report_URL', 'Filepath', 'Timestamp', 'Created_At'
+                ]
+            else:
+                headers = [
+                    'Hash_ID', 'Respondent_ID', 'Report_URL', 'Filepath', 'Timestamp', 'Created_At'
+                ]
+            
+            # Ensure headers exist
+            existing_values = sheet.get_all_values()
+            if len(existing_values) == 0:
+                sheet.append_row(headers)
+            elif existing_values[0] != headers:
+                sheet.insert_row(headers, index=1)
+            
+            sheet.append_rows(rows)
     
     def write_pm5final_results(self, respondent: Dict[str, Any], pm05_final: Dict[str, Any]):
         """Writes PM05 Final results to PM5Final sheet (one row per respondent)."""
@@ -0,0 +1,54 @@
+"""
+Smoke tests for LLMService construction and its per-instance prompt caches.
+"""
+
+import pytest
+
+pytest.importorskip('requests')
+
+from services.llm import LLMService
+
+
+def make_config(**overrides):
+    config = {
+        'llmApiKey': 'test-key',
+        'llmProvider': 'chatgpt',
+        'llmApiUrl': 'https://api.openai.com/v1/chat/completions',
+        'llmModel': 'gpt-4o-mini',
+        'llmMaxConcurrency': 2,
+        'llmRpm': 0,
+        'llmCacheTtl': 0,
+    }
+    config.update(overrides)
+    return config
+
+
+def test_constructs_with_minimal_config():
+    service = LLMService(make_config())
+    assert service.response_cache is None
+    assert service.pm05_final_model == 'gpt-4o-mini'
+
+
+def test_missing_api_key_is_rejected():
+    with pytest.raises(ValueError):
+        LLMService(make_config(llmApiKey=''))
+
+
+def test_answer_blocks_are_kept_for_the_current_respondent_only():
+    service = LLMService(make_config())
+    block = service._respondent_answer_block('R1', 'Name', 'answer', 'reason')
+    assert service._respondent_answer_block('R1', 'Name', 'answer', 'reason') is block
+    assert 'Answer: answer' in block and 'reason' in block
+    
+    service._respondent_answer_block('R2', 'Other', '', '')
+    blocks_id, blocks = service._answer_blocks
+    assert blocks_id == 'R2'
+    assert len(blocks) == 1
+
+
+def test_report_analysis_retries_until_a_json_object_comes_back(monkeypatch):
+    service = LLMService(make_config(maxRetries=3))
+    responses = iter([None, '{"structural_analysis": "ok"}'])
+    monkeypatch.setattr(LLMService, '_invoke_llm', lambda self, *args, **kwargs: next(responses))
+    
+    assert service.run_report_analysis('prompt', 'system') == {'structural_analysis': 'ok'}